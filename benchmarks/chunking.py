@@ -0,0 +1,92 @@
+"""Chunking microbenchmark: TokenChunker vs. the previous RecursiveCharacterTextSplitter.
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.chunking --size-mb 4 --repeat 3 --profile diverse
+
+Profiles: "prose" draws from a 5k-word vocabulary, "diverse" mixes in numbers and identifiers the
+way real documents do, "cjk" has no spaces at all.
+"""
+import argparse
+import random
+import time
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from tokenizers import Tokenizer
+
+from src.api.vectors.main import load_dense_model, load_multivector_model, load_chunker
+
+
+def synthetic_text(size_mb: float, seed: int = 0, profile: str = "prose") -> str:
+    rng = random.Random(seed)
+    vocabulary = [f"{rng.choice('bcdfghklmnprstvz')}{rng.choice('aeiou')}{rng.choice('lmnrst')}" * rng.randint(1, 3)
+                  for _ in range(5000)]
+    if profile == "cjk":
+        vocabulary = [chr(code) for code in range(0x4E00, 0x4E00 + 3000)]
+    paragraphs, size = [], 0
+    while size < size_mb * 1024 * 1024:
+        if profile == "cjk":
+            sentences = ["".join(rng.choices(vocabulary, k=rng.randint(10, 60))) + "。" for _ in range(rng.randint(2, 8))]
+        else:
+            sentences = [" ".join(word if profile == "prose" or rng.random() < 0.7 else f"{word}{rng.randint(0, 10 ** 6)}"
+                                  for word in rng.choices(vocabulary, k=rng.randint(6, 30))).capitalize() + "."
+                         for _ in range(rng.randint(2, 8))]
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs)
+
+
+def measure(name: str, split, text: str, repeat: int) -> list[str]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = split(text)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"{name:<32} best {best:7.3f}s  {len(text) / best / 1024 / 1024:7.2f} MB/s  {len(chunks):7d} chunks")
+    return chunks
+
+
+def token_report(name: str, chunks: list[str], tokenizer, limit: int):
+    lengths = [len(encoding.ids) for encoding in tokenizer.encode_batch(chunks)]
+    over = sum(length > limit for length in lengths)
+    lost = sum(max(length - limit, 0) for length in lengths)
+    print(f"{name:<32} tokens/chunk avg {sum(lengths) / len(lengths):6.1f}  max {max(lengths):5d}  "
+          f"over {limit}-token model limit: {over} ({over / len(lengths):.1%}), {lost} tokens truncated")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--profile", choices=["prose", "diverse", "cjk"], default="diverse")
+    parser.add_argument("--file", help="benchmark on a text file instead of synthetic text")
+    args = parser.parse_args()
+
+    text = open(args.file).read() if args.file else synthetic_text(args.size_mb, profile=args.profile)
+    dense_model = load_dense_model()
+    chunker = load_chunker(dense_model, load_multivector_model())
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100,
+                                              separators=["\n\n", "\n", ". ", " ", ""])
+
+    print(f"input: {len(text) / 1024 / 1024:.2f} MB")
+    legacy = measure("RecursiveCharacterTextSplitter", splitter.split_text, text, args.repeat)
+    current = measure("TokenChunker", chunker.split_text, text, args.repeat)
+
+    tokenizer = Tokenizer.from_str(dense_model.model.tokenizer.to_str()) # type: ignore[attr-defined]
+    limit = tokenizer.truncation["max_length"]
+    tokenizer.no_truncation()
+
+    # nearly all of TokenChunker's time is this call; encode_batch spreads it over every core
+    start = time.perf_counter()
+    tokenizer.encode_batch(text.splitlines(keepends=True), add_special_tokens=False)
+    print(f"{'tokenizer alone':<32} {time.perf_counter() - start:7.3f}s")
+    token_report("RecursiveCharacterTextSplitter", legacy, tokenizer, limit)
+    token_report("TokenChunker", current, tokenizer, limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""ColBERT token pooling benchmark: storage and rerank latency vs. recall.
+
+Embeds the paragraphs of the fixture corpus (see benchmarks.make_fixtures) as
+multivectors, pools them with every MULTI_POOL_FACTOR given on the command line
+and, for queries made of a short word span taken from a random paragraph,
+reranks the 100 best unpooled candidates with MAX_SIM. Reported per factor:
+
+* vectors and float32 bytes per point, and the reduction against factor 1;
+* pooling time per point (paid once at ingest) and rerank time per query;
+* recall@10 of the paragraph the query was taken from, and top-10 overlap with
+  the unpooled rerank.
+
+The configured ColBERT model is used by default; --synthetic replaces it with
+hashed word vectors mixed with their neighbours, which needs no model download.
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.colbert_pooling --pages 20 --queries 200 --factors 1 2 3 4
+"""
+import argparse
+import time
+import zlib
+
+import numpy as np
+
+from benchmarks.make_fixtures import corpus_paragraphs
+from src.core.config.vector import VectorConfig
+from src.core.utils.token_pooling import pool_tokens
+
+
+K = 10
+CANDIDATES = 100
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def synthetic_embed(text: str) -> np.ndarray:
+    words = [word.strip(".").lower() for word in text.split()]
+    vectors = np.stack([np.random.default_rng(zlib.crc32(word.encode())).standard_normal(VectorConfig.MULTI_MODEL_SIZE)
+                        for word in words])
+    context = np.zeros_like(vectors)
+    context[1:] += vectors[:-1]
+    context[:-1] += vectors[1:]
+    return normalize(vectors + 0.3 * context).astype(np.float32)
+
+
+def embed_corpus(paragraphs: list[str], queries: list[str], synthetic: bool):
+    if synthetic:
+        return [synthetic_embed(text) for text in paragraphs], [synthetic_embed(text) for text in queries]
+
+    from src.api.vectors.main import load_multivector_model
+    model = load_multivector_model()
+    return list(model.embed(paragraphs)), [next(iter(model.query_embed(text))) for text in queries]
+
+
+def sample_queries(paragraphs: list[str], count: int, seed: int = 0) -> tuple[list[str], list[int]]:
+    rng = np.random.default_rng(seed)
+    queries, targets = [], []
+    for target in rng.integers(0, len(paragraphs), count):
+        words = paragraphs[target].split()
+        length = min(len(words), int(rng.integers(4, 9)))
+        start = int(rng.integers(0, len(words) - length + 1))
+        queries.append(" ".join(words[start:start + length]))
+        targets.append(int(target))
+    return queries, targets
+
+
+def max_sim(query: np.ndarray, doc: np.ndarray) -> float:
+    return float((query @ doc.T).max(axis=1).sum())
+
+
+def rerank(query: np.ndarray, docs: list[np.ndarray], candidates: np.ndarray) -> np.ndarray:
+    scores = np.array([max_sim(query, docs[i]) for i in candidates])
+    return candidates[np.argsort(-scores)[:K]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20, help="size of the fixture corpus")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--source", help="text file to draw corpus words from")
+    parser.add_argument("--synthetic", action="store_true", help="use hashed word vectors instead of the model")
+    args = parser.parse_args()
+
+    paragraphs = corpus_paragraphs(args.pages, source=args.source)
+    queries, targets = sample_queries(paragraphs, args.queries)
+    docs, query_vectors = embed_corpus(paragraphs, queries, args.synthetic)
+
+    candidates = [np.argsort([-max_sim(query, doc) for doc in docs])[:CANDIDATES] for query in query_vectors]
+    exact = [rerank(query, docs, shortlist) for query, shortlist in zip(query_vectors, candidates)]
+    base_vectors = np.mean([len(doc) for doc in docs])
+    print(f"{len(docs)} points, {len(queries)} queries, {CANDIDATES} candidates per query")
+
+    print(f"{'factor':>6} {'vectors/pt':>11} {'bytes/pt':>9} {'reduction':>10} {'pool ms/pt':>11} "
+          f"{'rerank ms/q':>12} {'recall@10':>10} {'overlap@10':>11}")
+    for factor in args.factors:
+        start = time.perf_counter()
+        pooled = [pool_tokens(doc, factor) for doc in docs]
+        pool_ms = (time.perf_counter() - start) * 1000 / len(docs)
+
+        start = time.perf_counter()
+        found = [rerank(query, pooled, shortlist) for query, shortlist in zip(query_vectors, candidates)]
+        rerank_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        vectors = np.mean([len(doc) for doc in pooled])
+        recall = np.mean([target in top for target, top in zip(targets, found)])
+        overlap = np.mean([len(set(a) & set(b)) / K for a, b in zip(exact, found)])
+        print(f"{factor:>6d} {vectors:>11.1f} {vectors * docs[0].shape[1] * 4:>9.0f} {base_vectors / vectors:>9.2f}x "
+              f"{pool_ms:>11.2f} {rerank_ms:>12.2f} {recall:>10.3f} {overlap:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
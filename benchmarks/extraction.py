@@ -0,0 +1,75 @@
+"""Extraction benchmark: throughput and text fidelity per backend and format.
+
+Fidelity is the F1 score of word bigrams between the extracted text and the
+ground truth stored next to each fixture, so it drops both for lost words and for
+words glued together or reordered. For DOCX/ODT a "page" is one yielded section.
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.extraction --pages 5 50 200 --repeat 3
+"""
+import argparse
+import time
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.make_fixtures import make_fixtures
+from src.core.utils.extractors import PDF_BACKENDS, DocxExtractor, OdtExtractor, Extractor
+
+
+def bigrams(text: str) -> Counter:
+    words = text.split()
+    return Counter(zip(words, words[1:]))
+
+
+def fidelity(extracted: str, truth: str) -> float:
+    expected, actual = bigrams(truth), bigrams(extracted)
+    overlap = sum((expected & actual).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(actual.values())
+    recall = overlap / sum(expected.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def measure(name: str, extractor: Extractor, path: Path, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = list(extractor.extract(path))
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    text = "\n".join(pages)
+    score = fidelity(text, path.with_suffix(path.suffix + ".txt").read_text())
+    print(f"{name:<12} {path.name:<16} best {best:7.3f}s  {len(pages) / best:8.1f} pages/s  "
+          f"{len(text) / best / 1024 / 1024:6.2f} MB/s  fidelity {score:.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default="benchmarks/fixtures")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 50, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--source", help="text file to draw fixture words from")
+    parser.add_argument("--no-generate", action="store_true", help="benchmark existing fixtures only")
+    args = parser.parse_args()
+
+    fixtures = Path(args.fixtures)
+    if args.no_generate:
+        paths = sorted(path for path in fixtures.iterdir() if path.suffix in (".pdf", ".docx", ".odt"))
+    else:
+        paths = make_fixtures(fixtures, args.pages, args.source)
+
+    backends: dict[str, list[tuple[str, Extractor]]] = {
+        "pdf": [(name, backend()) for name, backend in PDF_BACKENDS.items()],
+        "docx": [("python-docx", DocxExtractor())],
+        "odt": [("odfpy", OdtExtractor())],
+    }
+    for path in paths:
+        for name, extractor in backends[path.suffix.lstrip(".")]:
+            measure(name, extractor, path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Generates a PDF/DOCX/ODT fixture corpus for the extraction benchmark.
+
+Every fixture is written next to a .txt file holding the text it was generated
+from, which the benchmark uses as ground truth for fidelity. PDFs are written by
+hand (Helvetica, no space glyphs, as most PDF producers do), so no PDF library
+is needed. Lines alternate between one TJ array with word gaps encoded as
+positioning offsets, and justified words placed one by one with Td, each split
+into two abutting Tj strings the way kerning producers emit them, so an
+extractor has to tell a word gap from a mid-word move by the actual distance.
+
+    python -m benchmarks.make_fixtures --out benchmarks/fixtures --pages 5 50 200
+"""
+import argparse
+import random
+import textwrap
+from pathlib import Path
+
+from docx import Document
+from odf.opendocument import OpenDocumentText
+from odf.text import P
+from pdfminer.fontmetrics import FONT_METRICS
+
+
+LINES_PER_PAGE = 60
+CHARS_PER_LINE = 95
+FONT_SIZE = 10
+HELVETICA_WIDTHS = FONT_METRICS["Helvetica"][1]
+
+
+def corpus_paragraphs(pages: int, seed: int = 0, source: str | None = None) -> list[str]:
+    rng = random.Random(seed)
+    if source is not None:
+        words = Path(source).read_text().split()
+    else:
+        words = [f"{rng.choice('bcdfghklmnprstvz')}{rng.choice('aeiou')}{rng.choice('lmnrst')}" * rng.randint(1, 3)
+                 for _ in range(5000)]
+
+    paragraphs, lines = [], 0
+    while lines < pages * LINES_PER_PAGE:
+        sentences = [" ".join(rng.choices(words, k=rng.randint(6, 30))).capitalize() + "."
+                     for _ in range(rng.randint(2, 8))]
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        lines += len(textwrap.wrap(paragraph, CHARS_PER_LINE)) + 1
+    return paragraphs
+
+
+def write_pdf(path: Path, paragraphs: list[str]):
+    lines: list[str] = []
+    for paragraph in paragraphs:
+        lines.extend(textwrap.wrap(paragraph, CHARS_PER_LINE))
+        lines.append("")
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in pages:
+        content = _page_content(page)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+def _page_content(lines: list[str]) -> bytes:
+    ops = ["BT", f"/F1 {FONT_SIZE} Tf", "12 TL", "50 800 Td"]
+    for number, line in enumerate(lines):
+        if number % 2:
+            ops.append(_positioned_line(line.split()))
+            continue
+        words = " -333 ".join(f"({_escape(word)})" for word in line.split())
+        ops.append(f"[{words}] TJ T*" if words else "T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("cp1252", errors="replace")
+
+
+def _positioned_line(words: list[str]) -> str:
+    ops, x = [], 0.0
+    for word in words:
+        head, tail = word[:len(word) // 2], word[len(word) // 2:]
+        # justified: a space plus a point of stretch between words
+        for part, gap in ((head, 0.0), (tail, _width(" ") + 1.0)):
+            if part:
+                ops.append(f"({_escape(part)}) Tj")
+                ops.append(f"{_width(part) + gap:.3f} 0 Td")
+                x += _width(part) + gap
+    ops.append(f"{-x:.3f} 0 Td T*")
+    return " ".join(ops)
+
+
+def _width(text: str) -> float:
+    return sum(HELVETICA_WIDTHS.get(char, 556) for char in text) * FONT_SIZE / 1000
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_docx(path: Path, paragraphs: list[str]):
+    doc = Document()
+    for paragraph in paragraphs:
+        doc.add_paragraph(paragraph)
+    doc.save(str(path))
+
+
+def write_odt(path: Path, paragraphs: list[str]):
+    doc = OpenDocumentText()
+    for paragraph in paragraphs:
+        doc.text.addElement(P(text=paragraph))
+    doc.save(str(path))
+
+
+WRITERS = {"pdf": write_pdf, "docx": write_docx, "odt": write_odt}
+
+
+def make_fixtures(out: Path, page_counts: list[int], source: str | None = None) -> list[Path]:
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for pages in page_counts:
+        paragraphs = corpus_paragraphs(pages, seed=pages, source=source)
+        for extension, write in WRITERS.items():
+            path = out / f"doc_{pages}p.{extension}"
+            write(path, paragraphs)
+            path.with_suffix(f".{extension}.txt").write_text("\n".join(paragraphs))
+            paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default="benchmarks/fixtures")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 50, 200])
+    parser.add_argument("--source", help="text file to draw words from instead of synthetic vocabulary")
+    args = parser.parse_args()
+
+    for path in make_fixtures(Path(args.out), args.pages, args.source):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
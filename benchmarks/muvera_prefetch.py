@@ -0,0 +1,71 @@
+"""MUVERA prefetch benchmark: candidate recall of fixed-dimensional encodings.
+
+Embeds the paragraphs of the fixture corpus as multivectors, encodes them as
+MUVERA FDEs for every (k_sim, dim_proj, repetitions) setting and reports, per
+setting, the FDE size, encoding time per point and the share of the exact
+MAX_SIM top 10 found in the FDE top 100, i.e. what the "muvera" prefetch branch
+hands to the rerank. Exact MAX_SIM scoring over the whole corpus is timed as
+the brute-force baseline the FDE search avoids.
+
+The configured ColBERT model is used by default; --synthetic uses the hashed
+word vectors of benchmarks.colbert_pooling instead.
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.muvera_prefetch --pages 50 --queries 100 --settings 4,16,8 5,16,20
+"""
+import argparse
+import time
+
+import numpy as np
+from fastembed.postprocess import Muvera
+
+from benchmarks.colbert_pooling import embed_corpus, max_sim, sample_queries
+from benchmarks.make_fixtures import corpus_paragraphs
+from src.core.config.vector import VectorConfig
+
+
+K = 10
+CANDIDATES = 100
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=50, help="size of the fixture corpus")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--settings", nargs="+", default=["3,8,8", "4,16,8", "5,16,20"],
+                        help="k_sim,dim_proj,repetitions triples")
+    parser.add_argument("--source", help="text file to draw corpus words from")
+    parser.add_argument("--synthetic", action="store_true", help="use hashed word vectors instead of the model")
+    args = parser.parse_args()
+
+    paragraphs = corpus_paragraphs(args.pages, source=args.source)
+    queries, _ = sample_queries(paragraphs, args.queries)
+    docs, query_vectors = embed_corpus(paragraphs, queries, args.synthetic)
+
+    start = time.perf_counter()
+    exact = [np.argsort([-max_sim(query, doc) for doc in docs])[:K] for query in query_vectors]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"{len(docs)} points, {len(queries)} queries, exact MAX_SIM scan {exact_ms:.2f} ms/query")
+
+    print(f"{'setting':<10} {'dims':>6} {'encode ms/pt':>13} {'scan ms/q':>10} {f'recall@{K} in top {CANDIDATES}':>20}")
+    for setting in args.settings:
+        k_sim, dim_proj, repetitions = (int(value) for value in setting.split(","))
+        muvera = Muvera(dim=VectorConfig.MULTI_MODEL_SIZE, k_sim=k_sim, dim_proj=dim_proj, r_reps=repetitions,
+                        random_seed=VectorConfig.MUVERA_SEED)
+
+        start = time.perf_counter()
+        encoded = np.stack([muvera.process_document(doc) for doc in docs])
+        encode_ms = (time.perf_counter() - start) * 1000 / len(docs)
+
+        fde_queries = np.stack([muvera.process_query(query) for query in query_vectors])
+        start = time.perf_counter()
+        found = np.argsort(-(fde_queries @ encoded.T), axis=1)[:, :CANDIDATES]
+        scan_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        recall = np.mean([len(set(truth) & set(candidates)) / K for truth, candidates in zip(exact, found)])
+        print(f"{setting:<10} {muvera.embedding_size:>6d} {encode_ms:>13.2f} {scan_ms:>10.3f} {recall:>20.3f}")
+
+
+if __name__ == "__main__":
+    main()
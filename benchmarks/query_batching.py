@@ -0,0 +1,104 @@
+"""Query embedding micro-batching benchmark: latency and throughput under load.
+
+Runs --clients concurrent searchers, each embedding --requests queries back to
+back through VectorService's query embedding step, once with a separate thread
+call per query and once through QueryEmbeddingBatcher with QUERY_BATCH_WINDOW_MS
+and QUERY_BATCH_MAX_SIZE, and reports queries/s with p50/p95 latency.
+
+The configured models are used by default; --synthetic replaces them with
+CPU-bound stand-ins costing a fixed per-call overhead plus a per-query cost,
+which is the shape batching exploits. Like fastembed's Colbert.query_embed, the
+ColBERT stand-in pays the call overhead once per query; only the real model is
+batched, by tokenizing the queries itself (src/core/utils/colbert_queries.py).
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.query_batching --clients 1 10 50 --requests 20
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from benchmarks.make_fixtures import corpus_paragraphs
+from src.api.vectors.main import init_query_batcher
+from src.api.vectors.service import VectorService
+from src.core.config.vector import VectorConfig
+
+
+class SyntheticModel:
+    def __init__(self, call_ms: float, item_ms: float, output, per_query_calls: bool = False):
+        self._call = call_ms / 1000
+        self._item = item_ms / 1000
+        self._output = output
+        self._per_query_calls = per_query_calls
+
+
+    def query_embed(self, texts, **kwargs):
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        calls = len(texts) if self._per_query_calls else 1
+        deadline = time.perf_counter() + self._call * calls + self._item * len(texts)
+        while time.perf_counter() < deadline:
+            pass
+        return (self._output() for _ in texts)
+
+
+def synthetic_models():
+    from fastembed import SparseEmbedding
+
+    rng = np.random.default_rng(0)
+    dense = SyntheticModel(3.0, 0.3, lambda: rng.standard_normal(VectorConfig.DENSE_MODEL_SIZE).astype(np.float32))
+    sparse = SyntheticModel(3.0, 0.3, lambda: SparseEmbedding(indices=np.arange(20), values=np.ones(20, dtype=np.float32)))
+    multi = SyntheticModel(3.0, 0.3, lambda: rng.standard_normal((32, VectorConfig.MULTI_MODEL_SIZE)).astype(np.float32),
+                           per_query_calls=True)
+    return dense, sparse, multi
+
+
+async def run_clients(vector_service: VectorService, queries: list[str], clients: int, requests: int) -> list[float]:
+    latencies: list[float] = []
+
+    async def client(offset: int):
+        for i in range(requests):
+            start = time.perf_counter()
+            await vector_service._get_query_embeddings(queries[(offset + i) % len(queries)])
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client(offset * requests) for offset in range(clients)))
+    return latencies
+
+
+async def measure(name: str, vector_service: VectorService, queries: list[str], clients: int, requests: int):
+    start = time.perf_counter()
+    latencies = await run_clients(vector_service, queries, clients, requests)
+    elapsed = time.perf_counter() - start
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    print(f"{name:<9} clients {clients:3d}  {len(latencies) / elapsed:8.1f} queries/s  "
+          f"p50 {p50:7.1f} ms  p95 {p95:7.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=20, help="queries per client")
+    parser.add_argument("--synthetic", action="store_true", help="use CPU-bound stand-ins instead of the models")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        dense, sparse, multi = synthetic_models()
+    else:
+        from src.api.vectors.main import load_dense_model, load_multivector_model, load_sparse_model
+        dense, sparse, multi = load_dense_model(), load_sparse_model(), load_multivector_model()
+
+    queries = [" ".join(paragraph.split()[:8]) for paragraph in corpus_paragraphs(5)]
+    per_call = VectorService(dense, sparse, multi, None) # type: ignore[arg-type]
+    batched = VectorService(dense, sparse, multi, None, # type: ignore[arg-type]
+                            query_batcher=init_query_batcher(dense, sparse, multi)) # type: ignore[arg-type]
+
+    for clients in args.clients:
+        await measure("per-call", per_call, queries, clients, args.requests)
+        await measure("batched", batched, queries, clients, args.requests)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""Stored vs. query-time ColBERT rerank: ingest cost and storage vs. query latency.
+
+Both sides of MULTI_STORAGE on the fixture corpus (see benchmarks.make_fixtures):
+
+* ingest: ColBERT embedding time per chunk and multivector bytes per point under
+  the configured storage profile, which MULTI_STORAGE=query_time saves;
+* query: latency of reranking 100 candidates per query with stored vectors
+  (MAX_SIM only), and through VectorService.rerank_candidates without a cache
+  and with a warm LRU bounded to RERANK_CACHE_MAX_BYTES. The warm pass repeats the
+  queries with a share (--overlap) of their candidates replaced by chunks that
+  were never reranked before, drawn from a held-out half of the corpus.
+
+The configured ColBERT model is used by default; --synthetic uses the hashed
+word vectors of benchmarks.colbert_pooling instead, which is only good for a
+smoke run since it is far cheaper than the model.
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.query_time_rerank --pages 40 --queries 50
+"""
+import argparse
+import time
+
+import numpy as np
+from qdrant_client import models
+
+from benchmarks.colbert_pooling import max_sim, sample_queries, synthetic_embed
+from benchmarks.make_fixtures import corpus_paragraphs
+from src.api.vectors.profiles import get_storage_profile
+from src.api.vectors.service import VectorService
+from src.core.config.vector import VectorConfig
+from src.core.utils.lru_cache import LRUCache
+
+
+CANDIDATES = 100
+
+
+class SyntheticModel:
+    def embed(self, texts, **kwargs):
+        return (synthetic_embed(text) for text in texts)
+
+
+    def query_embed(self, text, **kwargs):
+        return iter([synthetic_embed(text)])
+
+
+def candidate_points(paragraphs: list[str], ids: np.ndarray) -> list[models.ScoredPoint]:
+    return [models.ScoredPoint(id=int(i), version=0, score=0.0, payload={"chunk_text": paragraphs[i]}) for i in ids]
+
+
+def rerank_ms(vector_service: VectorService, queries: list[np.ndarray], candidates: list[list[models.ScoredPoint]]) -> float:
+    start = time.perf_counter()
+    for query, points in zip(queries, candidates):
+        vector_service.rerank_candidates(query, points)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=40, help="size of the fixture corpus")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--overlap", type=float, default=0.2, help="share of candidates replaced in the warm pass")
+    parser.add_argument("--source", help="text file to draw corpus words from")
+    parser.add_argument("--synthetic", action="store_true", help="use hashed word vectors instead of the model")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        model = SyntheticModel()
+    else:
+        from src.api.vectors.main import load_multivector_model
+        model = load_multivector_model()
+
+    paragraphs = corpus_paragraphs(args.pages, source=args.source)
+    queries, _ = sample_queries(paragraphs, args.queries)
+    query_vectors = [next(iter(model.query_embed(text))) for text in queries]
+
+    start = time.perf_counter()
+    stored = list(model.embed(paragraphs, batch_size=VectorConfig.EMBED_BATCH_SIZE))
+    embed_ms = (time.perf_counter() - start) * 1000 / len(paragraphs)
+    profile = get_storage_profile()
+    stored_bytes = np.mean([profile.encode_multi(doc).nbytes for doc in stored])
+    print(f"ingest: {len(paragraphs)} chunks, ColBERT {embed_ms:.2f} ms/chunk, "
+          f"{stored_bytes:.0f} B/point as {profile.multi_datatype.value} ({profile.name.lower()} profile)")
+
+    rng = np.random.default_rng(0)
+    held_out = len(paragraphs) // 2
+    size = min(CANDIDATES, held_out)
+    cold_ids = [rng.choice(held_out, size, replace=False) for _ in queries]
+    warm_ids = []
+    for ids in cold_ids:
+        ids = ids.copy()
+        replaced = rng.random(size) < args.overlap
+        ids[replaced] = rng.integers(held_out, len(paragraphs), int(replaced.sum()))
+        warm_ids.append(ids)
+
+    start = time.perf_counter()
+    for query, ids in zip(query_vectors, cold_ids):
+        sorted((max_sim(query, stored[i]) for i in ids), reverse=True)
+    stored_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    uncached = VectorService(None, None, model, None) # type: ignore[arg-type]
+    cold_ms = rerank_ms(uncached, query_vectors, [candidate_points(paragraphs, ids) for ids in cold_ids])
+
+    cache = LRUCache(max_bytes=VectorConfig.RERANK_CACHE_MAX_BYTES)
+    cached = VectorService(None, None, model, None, rerank_cache=cache) # type: ignore[arg-type]
+    rerank_ms(cached, query_vectors, [candidate_points(paragraphs, ids) for ids in cold_ids])
+    primed = cache.stats()
+    warm_ms = rerank_ms(cached, query_vectors, [candidate_points(paragraphs, ids) for ids in warm_ids])
+    warm = cache.stats()
+    hits = warm["hits"] - primed["hits"]
+    hit_rate = hits / (hits + warm["misses"] - primed["misses"])
+
+    print(f"query: {len(queries)} queries x {size} candidates")
+    print(f"{'stored multivectors':<28} {stored_ms:9.2f} ms/query")
+    print(f"{'query-time, no cache':<28} {cold_ms:9.2f} ms/query")
+    print(f"{'query-time, warm cache':<28} {warm_ms:9.2f} ms/query  (hit rate {hit_rate:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Sparse pruning benchmark: sparse index memory and query latency vs. recall.
+
+Encodes the paragraphs of the fixture corpus (see benchmarks.make_fixtures) and
+queries made of a short word span of a random paragraph with the configured
+sparse model, then prunes the document vectors with every top-k/min-weight
+setting given on the command line (queries use SPARSE_QUERY_TOP_K and
+SPARSE_QUERY_MIN_WEIGHT). Per setting it reports:
+
+* postings per point and the in-RAM sparse index size, estimated at 12 bytes
+  per posting (point id, weight and the max-next-weight Qdrant keeps per
+  element);
+* query latency over an inverted index of the pruned vectors, which scales with
+  the postings traversed like Qdrant's posting-list search does;
+* recall@10 against the unpruned index.
+
+--synthetic replaces the model with a SPLADE-like encoder (term frequency
+weights plus many low-weight expansion terms) that needs no model download.
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.sparse_pruning --pages 100 --queries 200 --settings none,0 128,0 64,0 32,0 none,0.1
+"""
+import argparse
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+from fastembed import SparseEmbedding
+
+from benchmarks.colbert_pooling import sample_queries
+from benchmarks.make_fixtures import corpus_paragraphs
+from src.core.config.vector import VectorConfig
+from src.core.utils.sparse_pruning import prune_sparse
+
+
+K = 10
+BYTES_PER_POSTING = 12
+VOCABULARY = 30522
+
+
+def synthetic_encode(text: str, expansion: int) -> SparseEmbedding:
+    counts = Counter(zlib.crc32(word.strip(".").lower().encode()) % VOCABULARY for word in text.split())
+    rng = np.random.default_rng(zlib.crc32(text.encode()))
+    weights = {term: float(np.log1p(count)) for term, count in counts.items()}
+    for term in rng.zipf(1.3, expansion) % VOCABULARY:
+        weights.setdefault(int(term), float(rng.exponential(0.05)))
+    indices = np.array(sorted(weights), dtype=np.int32)
+    return SparseEmbedding(indices=indices, values=np.array([weights[i] for i in indices], dtype=np.float32))
+
+
+def encode(paragraphs: list[str], queries: list[str], synthetic: bool):
+    if synthetic:
+        return [synthetic_encode(text, 150) for text in paragraphs], [synthetic_encode(text, 20) for text in queries]
+
+    from src.api.vectors.main import load_sparse_model
+    model = load_sparse_model()
+    return list(model.embed(paragraphs)), [next(iter(model.query_embed(text))) for text in queries]
+
+
+class InvertedIndex:
+    def __init__(self, docs: list[SparseEmbedding]):
+        postings: dict[int, list[tuple[int, float]]] = {}
+        for doc_id, doc in enumerate(docs):
+            for term, weight in zip(doc.indices.tolist(), doc.values.tolist()):
+                postings.setdefault(term, []).append((doc_id, weight))
+        self.size = len(docs)
+        self.postings = {term: (np.array([doc for doc, _ in items]), np.array([weight for _, weight in items]))
+                         for term, items in postings.items()}
+
+
+    def search(self, query: SparseEmbedding) -> np.ndarray:
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term, weight in zip(query.indices.tolist(), query.values.tolist()):
+            if term in self.postings:
+                docs, weights = self.postings[term]
+                scores[docs] += weight * weights
+        return np.argsort(-scores)[:K]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100, help="size of the fixture corpus")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--settings", nargs="+", default=["none,0", "128,0", "64,0", "32,0", "none,0.1"],
+                        help="top_k,min_weight pairs, top_k may be 'none'")
+    parser.add_argument("--source", help="text file to draw corpus words from")
+    parser.add_argument("--synthetic", action="store_true", help="use a SPLADE-like synthetic encoder instead of the model")
+    args = parser.parse_args()
+
+    paragraphs = corpus_paragraphs(args.pages, source=args.source)
+    queries, _ = sample_queries(paragraphs, args.queries)
+    docs, query_vectors = encode(paragraphs, queries, args.synthetic)
+    query_vectors = [prune_sparse(query, VectorConfig.SPARSE_QUERY_TOP_K, VectorConfig.SPARSE_QUERY_MIN_WEIGHT)
+                     for query in query_vectors]
+
+    exact = InvertedIndex(docs)
+    truth = [exact.search(query) for query in query_vectors]
+    print(f"{len(docs)} points, {len(queries)} queries, "
+          f"{np.mean([len(query.indices) for query in query_vectors]):.1f} terms per query")
+
+    print(f"{'setting':<12} {'postings/pt':>12} {'index MB':>9} {'ms/query':>9} {'recall@10':>10}")
+    for setting in args.settings:
+        top_k, min_weight = setting.split(",")
+        pruned = [prune_sparse(doc, None if top_k == "none" else int(top_k), float(min_weight)) for doc in docs]
+        index = InvertedIndex(pruned)
+        postings = sum(len(doc.indices) for doc in pruned)
+
+        start = time.perf_counter()
+        found = [index.search(query) for query in query_vectors]
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        recall = np.mean([len(set(a) & set(b)) / K for a, b in zip(truth, found)])
+        print(f"{setting:<12} {postings / len(docs):>12.1f} {postings * BYTES_PER_POSTING / 1024 ** 2:>9.2f} "
+              f"{elapsed_ms:>9.3f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
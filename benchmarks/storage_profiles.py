@@ -0,0 +1,153 @@
+"""Storage profile benchmark: memory per point vs. retrieval accuracy.
+
+Simulates each StorageProfile in numpy, without a Qdrant server:
+
+* dense quantization (int8 scalar, binary, x16 product) searched with the
+  profile's oversampling and rescored with the original vectors, reported
+  as recall@10 against exact float32 search;
+* the multivector datatype (float32, float16, uint8) used for the MAX_SIM
+  rerank of 100 prefetched candidates, reported as top-10 overlap with the
+  float32 rerank.
+
+Synthetic vectors are used by default; --texts embeds the lines of a text
+file with the configured models instead, which gives more realistic numbers.
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.storage_profiles --docs 5000 --queries 100
+"""
+import argparse
+
+import numpy as np
+from qdrant_client import models
+
+from src.api.vectors.profiles import StorageProfile
+from src.core.config.vector import VectorConfig
+
+
+K = 10
+CANDIDATES = 100
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def synthetic_data(docs: int, queries: int, tokens: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    topics = normalize(rng.standard_normal((docs // 20, VectorConfig.DENSE_MODEL_SIZE)))
+    dense = normalize(topics[rng.integers(0, len(topics), docs)] + 0.6 * rng.standard_normal((docs, topics.shape[1])) / 8)
+    targets = rng.integers(0, docs, queries)
+    dense_queries = normalize(dense[targets] + rng.standard_normal((queries, dense.shape[1])) / 16)
+
+    token_topics = normalize(rng.standard_normal((512, VectorConfig.MULTI_MODEL_SIZE)))
+    multi = [normalize(token_topics[rng.integers(0, 512, tokens)] + rng.standard_normal((tokens, 128)) / 4)
+             for _ in range(CANDIDATES)]
+    multi_queries = [normalize(multi[rng.integers(0, CANDIDATES)][rng.integers(0, tokens, 32)]
+                               + rng.standard_normal((32, 128)) / 4) for _ in range(queries)]
+    return dense.astype(np.float32), dense_queries.astype(np.float32), multi, multi_queries
+
+
+def embedded_data(path: str, queries: int, seed: int = 0):
+    from src.api.vectors.main import load_dense_model, load_multivector_model
+
+    texts = [line.strip() for line in open(path) if line.strip()]
+    rng = np.random.default_rng(seed)
+    sampled = [texts[i] for i in rng.integers(0, len(texts), queries)]
+    dense_model, multi_model = load_dense_model(), load_multivector_model()
+
+    dense = normalize(np.array(list(dense_model.embed(texts)), dtype=np.float32))
+    dense_queries = normalize(np.array([next(iter(dense_model.query_embed(text[:200]))) for text in sampled], dtype=np.float32))
+    multi = list(multi_model.embed(texts[:CANDIDATES]))
+    multi_queries = [next(iter(multi_model.query_embed(text[:200]))) for text in sampled]
+    return dense, dense_queries, multi, multi_queries
+
+
+def kmeans(data: np.ndarray, clusters: int, iterations: int = 8, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), min(clusters, len(data)), replace=False)]
+    for _ in range(iterations):
+        assignment = ((data[:, None, :] - centroids[None]) ** 2).sum(-1).argmin(1)
+        for c in range(len(centroids)):
+            members = data[assignment == c]
+            if len(members):
+                centroids[c] = members.mean(0)
+    return centroids
+
+
+def quantized_scores(kind: str, dense: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    if kind == "binary":
+        return np.sign(queries) @ np.sign(dense).T
+    if kind == "product":
+        sub = 4
+        scores = np.zeros((len(queries), len(dense)), dtype=np.float32)
+        for start in range(0, dense.shape[1], sub):
+            part = dense[:, start:start + sub]
+            centroids = kmeans(part, 256)
+            codes = ((part[:, None, :] - centroids[None]) ** 2).sum(-1).argmin(1)
+            scores += (queries[:, start:start + sub] @ centroids.T)[:, codes]
+        return scores
+    low, high = np.quantile(dense, 0.005), np.quantile(dense, 0.995)
+    step = (high - low) / 255
+    return queries @ (np.rint((np.clip(dense, low, high) - low) / step) * step + low).T
+
+
+def dense_recall(profile: StorageProfile, dense: np.ndarray, queries: np.ndarray) -> float:
+    exact = queries @ dense.T
+    truth = np.argsort(-exact, axis=1)[:, :K]
+    approx = quantized_scores(profile.quantization, dense, queries)
+    shortlist = np.argsort(-approx, axis=1)[:, :int(K * profile.oversampling)]
+    rescored = np.take_along_axis(exact, shortlist, 1)
+    found = np.take_along_axis(shortlist, np.argsort(-rescored, axis=1)[:, :K], 1)
+    return float(np.mean([len(set(t) & set(f)) / K for t, f in zip(truth, found)]))
+
+
+def max_sim(query: np.ndarray, doc: np.ndarray) -> float:
+    return float((query @ doc.T).max(axis=1).sum())
+
+
+def rerank_overlap(profile: StorageProfile, multi: list[np.ndarray], queries: list[np.ndarray]) -> float:
+    overlaps = []
+    for query in queries:
+        exact = np.argsort([-max_sim(query, doc) for doc in multi])[:K]
+        if profile.multi_datatype == models.Datatype.FLOAT16:
+            stored = [doc.astype(np.float16).astype(np.float32) for doc in multi]
+            encoded = query.astype(np.float16).astype(np.float32)
+        else:
+            stored = [profile.encode_multi(doc).astype(np.float32) for doc in multi]
+            encoded = profile.encode_multi(query).astype(np.float32)
+        approx = np.argsort([-max_sim(encoded, doc) for doc in stored])[:K]
+        overlaps.append(len(set(exact) & set(approx)) / K)
+    return float(np.mean(overlaps))
+
+
+def bytes_per_point(profile: StorageProfile, dense_size: int, multi_size: int, tokens: int) -> tuple[float, int]:
+    quantized = {"scalar": dense_size, "binary": dense_size / 8, "product": dense_size * 4 / 16}[profile.quantization]
+    datatype = {models.Datatype.FLOAT32: 4, models.Datatype.FLOAT16: 2, models.Datatype.UINT8: 1}[profile.multi_datatype]
+    return quantized, tokens * multi_size * datatype
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--tokens", type=int, default=180, help="ColBERT vectors per synthetic chunk")
+    parser.add_argument("--texts", help="embed the lines of this file with the configured models instead")
+    args = parser.parse_args()
+
+    if args.texts:
+        dense, dense_queries, multi, multi_queries = embedded_data(args.texts, args.queries)
+    else:
+        dense, dense_queries, multi, multi_queries = synthetic_data(args.docs, args.queries, args.tokens)
+    tokens = int(np.mean([len(doc) for doc in multi]))
+
+    print(f"{'profile':<12} {'dense RAM B/pt':>15} {'multi disk B/pt':>16} {'dense recall@10':>16} {'rerank overlap@10':>18}")
+    for profile in StorageProfile:
+        ram, disk = bytes_per_point(profile, dense.shape[1], multi[0].shape[1], tokens)
+        recall = dense_recall(profile, dense, dense_queries)
+        overlap = rerank_overlap(profile, multi, multi_queries)
+        print(f"{profile.name.lower():<12} {ram:>15.0f} {disk:>16d} {recall:>16.3f} {overlap:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Upload throughput benchmark for the ingest upload stage.
+
+Uploads synthetic points (dense, sparse and ColBERT-sized multivectors) through
+IngestPipeline.upload for every combination of batch size and upload workers,
+and reports points/s. Runs against Qdrant's in-process mode by default, so no
+server is needed. The in-process mode is not thread-safe, so its writes are
+serialized here and parallel workers only pay off against a real server (--url).
+
+Run from the repository root (the .env file has to be present):
+
+    python -m benchmarks.upload_throughput --points 4000 --batch-sizes 32 64 128 --workers 1 2 4
+    python -m benchmarks.upload_throughput --url http://localhost:6333
+"""
+import argparse
+import time
+import uuid
+from threading import Lock
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+from src.api.vectors.service import VectorService
+from src.core.config.vector import VectorConfig
+from src.core.inference.pipeline import IngestPipeline
+from src.core.utils.file_manager import FileManager
+
+
+COLLECTION = "upload_benchmark"
+
+
+class LocalClient(QdrantClient):
+    def __init__(self):
+        super().__init__(location=":memory:")
+        self._write_lock = Lock()
+
+
+    def upsert(self, *args, **kwargs):
+        with self._write_lock:
+            return super().upsert(*args, **kwargs)
+
+
+def synthetic_points(count: int, multi_tokens: int, seed: int = 0) -> list[models.PointStruct]:
+    rng = np.random.default_rng(seed)
+    points = []
+    for i in range(count):
+        indices = np.unique(rng.integers(0, 30000, size=120))
+        points.append(models.PointStruct(
+            id=str(uuid.UUID(int=i + 1)),
+            payload={"doc_id": i // 100, "chunk_index": i % 100, "chunk_text": "x" * 1000},
+            vector={
+                "dense": rng.standard_normal(VectorConfig.DENSE_MODEL_SIZE).astype(np.float32).tolist(),
+                "sparse": models.SparseVector(indices=indices.tolist(), values=rng.random(len(indices)).tolist()),
+                "multi": rng.standard_normal((multi_tokens, VectorConfig.MULTI_MODEL_SIZE)).astype(np.float32).tolist(),
+            }, # type: ignore
+        ))
+    return points
+
+
+def recreate_collection(client: QdrantClient):
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        collection_name=COLLECTION,
+        vectors_config={
+            "dense": models.VectorParams(size=VectorConfig.DENSE_MODEL_SIZE, distance=models.Distance.COSINE),
+            "multi": models.VectorParams(
+                size=VectorConfig.MULTI_MODEL_SIZE,
+                distance=models.Distance.COSINE,
+                multivector_config=models.MultiVectorConfig(comparator=models.MultiVectorComparator.MAX_SIM),
+                hnsw_config=models.HnswConfigDiff(m=0),
+            ),
+        },
+        sparse_vectors_config={"sparse": models.SparseVectorParams()},
+    )
+
+
+def measure(client: QdrantClient, points: list[models.PointStruct], batch_size: int, workers: int):
+    recreate_collection(client)
+    vector_service = VectorService(None, None, None, client) # type: ignore[arg-type]
+    pipeline = IngestPipeline(FileManager(), vector_service, None, page_queue_size=1, queue_size=1,
+                              upload_batch_size=batch_size, upload_workers=workers)
+    batches = (points[i:i + batch_size] for i in range(0, len(points), batch_size))
+
+    start = time.perf_counter()
+    pipeline.upload(batches)
+    elapsed = time.perf_counter() - start
+
+    stored = client.count(COLLECTION).count
+    print(f"batch {batch_size:5d}  workers {workers:2d}  {elapsed:7.2f}s  {len(points) / elapsed:8.1f} points/s  "
+          f"stored {stored}/{len(points)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=":memory:", help="Qdrant URL, or :memory: for the in-process mode")
+    parser.add_argument("--points", type=int, default=4000)
+    parser.add_argument("--multi-tokens", type=int, default=64, help="ColBERT vectors per point")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    client = LocalClient() if args.url == ":memory:" else QdrantClient(url=args.url)
+    VectorConfig.VECTOR_COLLECTION_NAME = COLLECTION
+    points = synthetic_points(args.points, args.multi_tokens)
+
+    try:
+        for batch_size in args.batch_sizes:
+            for workers in args.workers:
+                measure(client, points, batch_size, workers)
+    finally:
+        client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,13 +20,17 @@ from src.core.config.app import AppConfig
 
 from src.core.config.mail import init_mail
 from src.core.db.main import init_engine, init_sesssionmaker
-from src.core.utils.cache_manager import init_redis
+from src.core.utils.cache_manager import init_redis, init_binary_redis
 from src.api.vectors.main import (
     init_async_client,
     load_dense_model,
     load_multivector_model,
     load_sparse_model,
-    init_vector_collection
+    init_vector_collection,
+    init_rerank_cache,
+    init_query_batcher,
+    init_query_cache,
+    init_stage_latencies
 )
 
 
@@ -43,9 +47,15 @@ async def lifespan(app: FastAPI):
     app.state.dense_model = load_dense_model()
     app.state.sparse_model = load_sparse_model()
     app.state.multi_model = load_multivector_model()
+    app.state.rerank_cache = init_rerank_cache()
+    app.state.query_batcher = init_query_batcher(app.state.dense_model, 
+                                                 app.state.sparse_model, 
+                                                 app.state.multi_model)
+    app.state.stage_latencies = init_stage_latencies()
     await init_vector_collection(vector_client)
 
     app.state.redis = init_redis()
+    app.state.query_cache = init_query_cache(init_binary_redis(app.state.redis))
 
     app.state.fastmail = init_mail()
 
@@ -67,6 +77,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Search-Stages"],
 )
 
 app.mount("/static", StaticFiles(directory="src/static", html=True), name="static")
@@ -37,6 +37,7 @@ async def delete_category(cat_id: int, curr_user: UserGet = Security(RoleChecker
         cat_service = CategoryService(uow)
         await cat_service.delete_category(curr_user.group.uid, cat_id)
         await cache_man.delete_cached_category(str(curr_user.group.uid), cat_id)
+        await cache_man.bump_search_generation(str(curr_user.group.uid))
 
 
 @cat_router.post("/add-category")
@@ -46,6 +47,7 @@ async def add_category(cat_name: str, curr_user: UserGet = Security(RoleChecker(
         cat_service = CategoryService(uow)
         new_cat = await cat_service.add_category(curr_user.group.uid, cat_name)
         await cache_man.add_or_update_cached_category(str(curr_user.group.uid), new_cat)
+        await cache_man.bump_search_generation(str(curr_user.group.uid))
 
 
 @cat_router.post("/update-category")
@@ -54,4 +56,5 @@ async def update_category(cat_update: CategoryUpdate, curr_user: UserGet = Secur
     async with uow:
         cat_service = CategoryService(uow)
         updated_cat = await cat_service.update_category(curr_user.group.uid, cat_update)
-        await cache_man.add_or_update_cached_category(str(curr_user.group.uid), updated_cat)
\ No newline at end of file
+        await cache_man.add_or_update_cached_category(str(curr_user.group.uid), updated_cat)
+        await cache_man.bump_search_generation(str(curr_user.group.uid))
\ No newline at end of file
@@ -0,0 +1,72 @@
+from collections.abc import Callable
+import asyncio
+from typing import Any
+
+
+async def encode_queries(encoders: dict[str, Callable[[list[str]], list]], texts: list[str], 
+                         concurrent: bool) -> dict[str, list]:
+    if not concurrent:
+        return await asyncio.to_thread(lambda: {name: encoder(texts) for name, encoder in encoders.items()})
+    # the ONNX sessions release the GIL, so a query costs the slowest model instead of the sum of all three
+    results = await asyncio.gather(*(asyncio.to_thread(encoder, texts) for encoder in encoders.values()))
+    return dict(zip(encoders, results))
+
+
+class QueryEmbeddingBatcher:
+    def __init__(self, encoders: dict[str, Callable[[list[str]], list]], window_ms: float, max_batch_size: int, 
+                 concurrent_models: bool = True):
+        self._encoders = encoders
+        self._concurrent_models = concurrent_models
+        self._window = window_ms / 1000
+        self._max_batch_size = max_batch_size
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+
+
+    async def embed(self, query: str) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, future))
+
+        # an idle encoder has nothing to wait for, so only queries arriving while a batch runs get coalesced
+        if len(self._pending) >= self._max_batch_size or not self._running:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+
+        return await future
+
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._batch_done)
+
+
+    def _batch_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if self._pending and not self._running:
+            self._flush()
+
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]):
+        texts = [query for query, _ in batch]
+        try:
+            results = await encode_queries(self._encoders, texts, self._concurrent_models)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for i, (_, future) in enumerate(batch):
+            # the caller may have gone away (client disconnect cancels the request task)
+            if not future.done():
+                future.set_result({name: embeddings[i] for name, embeddings in results.items()})
@@ -0,0 +1,75 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+import time
+
+
+class StageLatencies:
+    def __init__(self, smoothing: float):
+        self._smoothing = smoothing
+        self._averages: dict[str, float] = {}
+
+
+    def estimate(self, key: str) -> float:
+        # stages that never ran are assumed free, so they run once and get measured
+        return self._averages.get(key, 0.0)
+
+
+    def observe(self, key: str, elapsed_ms: float):
+        average = self._averages.get(key)
+        self._averages[key] = elapsed_ms if average is None else average + self._smoothing * (elapsed_ms - average)
+
+
+    def relax(self, key: str):
+        # a skipped stage is never measured, so its estimate decays until it fits a budget and runs again
+        if key in self._averages:
+            self._averages[key] *= 1 - self._smoothing
+
+
+class SearchDeadline:
+    def __init__(self, budget_ms: float | None, latencies: StageLatencies | None, scope: str):
+        self._budget_ms = budget_ms
+        self._deadline = time.perf_counter() + budget_ms / 1000 if budget_ms is not None else None
+        self._latencies = latencies
+        self._scope = scope
+        self.stages: list[dict] = []
+        self.degraded = False
+
+
+    def remaining_ms(self) -> float:
+        if self._deadline is None:
+            return float("inf")
+        return (self._deadline - time.perf_counter()) * 1000
+
+
+    def estimate_ms(self, *stages: str) -> float:
+        if self._latencies is None:
+            return 0.0
+        return sum(self._latencies.estimate(f"{self._scope}:{stage}") for stage in stages)
+
+
+    def allows(self, *stages: str) -> bool:
+        return self.remaining_ms() >= self.estimate_ms(*stages)
+
+
+    @contextmanager
+    def stage(self, name: str, observe: bool = True, **details) -> Iterator[dict]:
+        record = {"stage": name, **details}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["ms"] = round((time.perf_counter() - start) * 1000, 1)
+            self.stages.append(record)
+            if self._latencies is not None and observe:
+                elapsed_ms = record["ms"]
+                if record.get("timed_out") and self._budget_ms is not None:
+                    # the cut-off duration understates the stage, so it counts as taking the whole budget
+                    elapsed_ms = max(elapsed_ms, self._budget_ms)
+                self._latencies.observe(f"{self._scope}:{name}", elapsed_ms)
+
+
+    def skip(self, name: str, reason: str):
+        self.degraded = True
+        self.stages.append({"stage": name, "skipped": reason})
+        if self._latencies is not None:
+            self._latencies.relax(f"{self._scope}:{name}")
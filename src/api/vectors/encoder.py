@@ -0,0 +1,92 @@
+from collections.abc import Callable, Iterable, Iterator
+from queue import Queue, Full, Empty
+from threading import Thread, Event
+from typing import Any
+
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class ConcurrentEncoder:
+    def __init__(self, encoders: dict[str, Callable[[list[str]], list]], queue_size: int = 2):
+        self._encoders = encoders
+        self._queue_size = queue_size
+
+
+    def encode(self, batches: Iterable[tuple[list[str], Any]]) -> Iterator[tuple[Any, dict[str, list]]]:
+        stop = Event()
+        inputs = {name: Queue(maxsize=self._queue_size) for name in self._encoders}
+        outputs = {name: Queue(maxsize=self._queue_size) for name in self._encoders}
+        contexts: Queue = Queue(maxsize=self._queue_size * 2)
+
+        threads = [Thread(target=self._run_model, args=(encoder, inputs[name], outputs[name], stop), daemon=True)
+                   for name, encoder in self._encoders.items()]
+        threads.append(Thread(target=self._feed, args=(batches, inputs, contexts, stop), daemon=True))
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                context = contexts.get()
+                if context is _DONE:
+                    break
+                if isinstance(context, _Failure):
+                    raise context.exc
+
+                results = {}
+                for name, queue in outputs.items():
+                    result = queue.get()
+                    if isinstance(result, _Failure):
+                        raise result.exc
+                    results[name] = result
+
+                yield context, results
+        finally:
+            stop.set()
+
+
+    def _feed(self, batches: Iterable[tuple[list[str], Any]], inputs: dict[str, Queue], contexts: Queue, stop: Event):
+        try:
+            for texts, context in batches:
+                for queue in inputs.values():
+                    self._put(queue, texts, stop)
+                self._put(contexts, context, stop)
+                if stop.is_set():
+                    return
+        except BaseException as exc:
+            self._put(contexts, _Failure(exc), stop)
+        finally:
+            for queue in inputs.values():
+                self._put(queue, _DONE, stop)
+            self._put(contexts, _DONE, stop)
+
+
+    def _run_model(self, encoder: Callable[[list[str]], list], inputs: Queue, outputs: Queue, stop: Event):
+        while not stop.is_set():
+            try:
+                texts = inputs.get(timeout=0.1)
+            except Empty:
+                continue
+            if texts is _DONE:
+                return
+            try:
+                result = encoder(texts)
+            except BaseException as exc:
+                result = _Failure(exc)
+            self._put(outputs, result, stop)
+
+
+    @staticmethod
+    def _put(queue: Queue, item: Any, stop: Event):
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return
+            except Full:
+                continue
@@ -1,10 +1,33 @@
 import asyncio
+from collections.abc import Callable
+from functools import lru_cache
 
 from qdrant_client import models, AsyncQdrantClient, QdrantClient
 from fastembed import TextEmbedding, SparseTextEmbedding, LateInteractionTextEmbedding
+from fastembed.postprocess import Muvera
 from fastapi import Request, Depends
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 
+from src.core.config.db import DBConfig
 from src.core.config.vector import VectorConfig
+from src.api.vectors.batcher import QueryEmbeddingBatcher
+from src.api.vectors.deadline import StageLatencies
+from src.api.vectors.muvera import MuveraMode, get_muvera_mode
+from src.api.vectors.profiles import (
+    MultiStorage, 
+    SparseBackend, 
+    StorageProfile, 
+    get_multi_storage, 
+    get_sparse_backend, 
+    get_storage_profile
+)
+from src.core.utils.colbert_queries import embed_colbert_queries
+from src.core.utils.embedding_cache import EmbeddingCache
+from src.core.utils.ingest_checkpoint import IngestCheckpoint
+from src.core.utils.lru_cache import LRUCache
+from src.core.utils.query_cache import QueryEmbeddingCache
+from src.core.utils.text_chunker import TokenChunker
 
 def init_client() -> QdrantClient:
     return QdrantClient(url=VectorConfig.VECTOR_DB_URL)
@@ -13,56 +36,131 @@ def init_async_client() -> AsyncQdrantClient:
     return AsyncQdrantClient(url=VectorConfig.VECTOR_DB_URL)
 
 def load_dense_model() -> TextEmbedding:
-    return TextEmbedding(VectorConfig.DENSE_MODEL, device="cpu")
+    return TextEmbedding(VectorConfig.DENSE_MODEL, device="cpu", threads=VectorConfig.DENSE_MODEL_THREADS)
 
 def load_sparse_model() -> SparseTextEmbedding:
-    return SparseTextEmbedding(VectorConfig.SPARSE_MODEL)
+    backend = get_sparse_backend()
+    if backend is SparseBackend.BM25:
+        return SparseTextEmbedding(backend.model_name, avg_len=VectorConfig.BM25_AVG_LEN)
+    return SparseTextEmbedding(backend.model_name, threads=VectorConfig.SPARSE_MODEL_THREADS)
 
 def load_multivector_model() -> LateInteractionTextEmbedding:
-    return LateInteractionTextEmbedding(VectorConfig.MULTI_MODEL)
+    return LateInteractionTextEmbedding(VectorConfig.MULTI_MODEL, threads=VectorConfig.MULTI_MODEL_THREADS)
+
+@lru_cache(maxsize=1)
+def load_muvera() -> Muvera | None:
+    if get_muvera_mode() is MuveraMode.OFF:
+        return None
+    if get_multi_storage() is MultiStorage.QUERY_TIME:
+        raise ValueError("MUVERA encodings are built from ingest-time ColBERT vectors, "
+                         "which MULTI_STORAGE=query_time does not compute")
+    return Muvera(dim=VectorConfig.MULTI_MODEL_SIZE, 
+                  k_sim=VectorConfig.MUVERA_K_SIM, 
+                  dim_proj=VectorConfig.MUVERA_DIM_PROJ,
+                  r_reps=VectorConfig.MUVERA_REPETITIONS, 
+                  random_seed=VectorConfig.MUVERA_SEED)
+
+def load_chunker(dense_model: TextEmbedding, multi_model: LateInteractionTextEmbedding) -> TokenChunker:
+    tokenizers = [dense_model.model.tokenizer, multi_model.model.tokenizer] # type: ignore[attr-defined]
+    model_limit = min(tokenizer.truncation["max_length"] for tokenizer in tokenizers) - 2
+    return TokenChunker(tokenizers[0], 
+                        max_tokens=min(VectorConfig.CHUNK_MAX_TOKENS, model_limit), 
+                        overlap_tokens=VectorConfig.CHUNK_OVERLAP_TOKENS)
+
+def init_embedding_cache() -> EmbeddingCache | None:
+    if VectorConfig.EMBEDDING_CACHE_PATH is None:
+        return None
+    return EmbeddingCache(VectorConfig.EMBEDDING_CACHE_PATH, VectorConfig.EMBEDDING_CACHE_MAX_BYTES)
+
+def ingest_version() -> str:
+    parts = [VectorConfig.DENSE_MODEL, get_sparse_backend().model_name, VectorConfig.MULTI_MODEL,
+             str(VectorConfig.CHUNK_MAX_TOKENS), str(VectorConfig.CHUNK_OVERLAP_TOKENS)]
+    if load_muvera() is not None:
+        parts.append(f"muvera-{VectorConfig.MUVERA_K_SIM}-{VectorConfig.MUVERA_DIM_PROJ}-"
+                     f"{VectorConfig.MUVERA_REPETITIONS}-{VectorConfig.MUVERA_SEED}")
+    if get_muvera_mode() is MuveraMode.REPLACE_DENSE:
+        parts.append("no-dense")
+    if get_multi_storage() is MultiStorage.QUERY_TIME:
+        parts.append("query-time-multi")
+    return ":".join(parts)
+
+def init_ingest_checkpoint() -> IngestCheckpoint:
+    redis = Redis.from_url(DBConfig.REDIS_URL, decode_responses=True)
+    return IngestCheckpoint(redis, ingest_version(), VectorConfig.INGEST_CHECKPOINT_EXPIRY_SECONDS)
+
+def init_rerank_cache() -> LRUCache | None:
+    if get_multi_storage() is MultiStorage.STORED:
+        return None
+    return LRUCache(max_bytes=VectorConfig.RERANK_CACHE_MAX_BYTES)
+
+def query_encoders(dense_model: TextEmbedding, sparse_model: SparseTextEmbedding, 
+                   multi_model: LateInteractionTextEmbedding) -> dict[str, Callable[[list[str]], list]]:
+    encoders = {
+        "sparse": lambda texts: list(sparse_model.query_embed(texts)),
+        "multi": lambda texts: embed_colbert_queries(multi_model, texts),
+    }
+    if get_muvera_mode() is not MuveraMode.REPLACE_DENSE:
+        encoders["dense"] = lambda texts: list(dense_model.query_embed(texts))
+    return encoders
+
+def init_query_batcher(dense_model: TextEmbedding, sparse_model: SparseTextEmbedding, 
+                       multi_model: LateInteractionTextEmbedding) -> QueryEmbeddingBatcher | None:
+    if VectorConfig.QUERY_BATCH_MAX_SIZE <= 1:
+        return None
+    return QueryEmbeddingBatcher(query_encoders(dense_model, sparse_model, multi_model),
+                                 window_ms=VectorConfig.QUERY_BATCH_WINDOW_MS,
+                                 max_batch_size=VectorConfig.QUERY_BATCH_MAX_SIZE,
+                                 concurrent_models=VectorConfig.QUERY_CONCURRENT_MODELS)
+
+def query_embedding_version() -> str:
+    parts = [get_sparse_backend().model_name, VectorConfig.MULTI_MODEL]
+    if get_muvera_mode() is not MuveraMode.REPLACE_DENSE:
+        parts.insert(0, VectorConfig.DENSE_MODEL)
+    return ":".join(parts)
+
+def init_query_cache(redis: AsyncRedis | None) -> QueryEmbeddingCache | None:
+    if not VectorConfig.QUERY_CACHE_REDIS:
+        redis = None
+    if redis is None and VectorConfig.QUERY_CACHE_ITEMS <= 0:
+        return None
+    return QueryEmbeddingCache(redis, query_embedding_version(), 
+                               VectorConfig.QUERY_CACHE_ITEMS, VectorConfig.QUERY_CACHE_EXPIRY_SECONDS)
+
+def get_query_cache(request: Request) -> QueryEmbeddingCache | None:
+    return request.app.state.query_cache
+
+def init_stage_latencies() -> StageLatencies:
+    return StageLatencies(VectorConfig.SEARCH_STAGE_SMOOTHING)
+
+def get_stage_latencies(request: Request) -> StageLatencies:
+    return request.app.state.stage_latencies
 
 def get_querying_client_components(request: Request) -> tuple:
     return (
         request.app.state.dense_model,
         request.app.state.sparse_model,
         request.app.state.multi_model,
-        request.app.state.vector_client)
+        request.app.state.vector_client,
+        request.app.state.rerank_cache,
+        request.app.state.query_batcher,
+        request.app.state.query_cache)
 
 
 
 async def init_vector_collection(client: AsyncQdrantClient, dense_size: int = VectorConfig.DENSE_MODEL_SIZE, multi_size: int = VectorConfig.MULTI_MODEL_SIZE):
     if not await client.collection_exists(VectorConfig.VECTOR_COLLECTION_NAME):
+        profile = get_storage_profile()
         await client.create_collection(collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
                                             vectors_config={
-                                                "dense": models.VectorParams(
-                                                    size=dense_size, 
-                                                    distance=models.Distance.COSINE,
-                                                    on_disk=True,
-                                                    hnsw_config=models.HnswConfigDiff(
-                                                        payload_m=16,
-                                                        m=0,
-                                                    )
-                                                ),
-                                                "multi": models.VectorParams(
-                                                    size=multi_size,
-                                                    distance=models.Distance.COSINE,
-                                                    multivector_config=models.MultiVectorConfig(
-                                                        comparator=models.MultiVectorComparator.MAX_SIM
-                                                    ),
-                                                    on_disk=True,
-                                                    hnsw_config=models.HnswConfigDiff(m=0)
-                                                ),
+                                                **_dense_vectors_config(dense_size),
+                                                **_multi_vectors_config(profile, multi_size),
+                                                **_muvera_vectors_config(),
                                             },
-                                            quantization_config= models.ScalarQuantization(
-                                                scalar=models.ScalarQuantizationConfig(
-                                                    type=models.ScalarType.INT8,
-                                                    quantile=0.99,
-                                                    always_ram=True,
-                                                ),         
-                                            ),
+                                            quantization_config=profile.quantization_config(),
                                             sparse_vectors_config={
                                                 "sparse": models.SparseVectorParams(
-                                                    index=models.SparseIndexParams(on_disk=False)
+                                                    index=models.SparseIndexParams(on_disk=False),
+                                                    modifier=get_sparse_backend().modifier
                                                 ),
                                             },
                                         )
@@ -92,4 +190,60 @@ async def init_vector_collection(client: AsyncQdrantClient, dense_size: int = Ve
             field_name="category_id",
             field_schema=models.PayloadSchemaType.INTEGER
         )
-        
\ No newline at end of file
+
+        await client.create_payload_index(
+            collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+            field_name="doc_id",
+            field_schema=models.PayloadSchemaType.INTEGER
+        )
+
+        await client.create_payload_index(
+            collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+            field_name="multi_ready",
+            field_schema=models.PayloadSchemaType.BOOL
+        )
+
+
+def _dense_vectors_config(dense_size: int) -> dict[str, models.VectorParams]:
+    if get_muvera_mode() is MuveraMode.REPLACE_DENSE:
+        return {}
+    return {"dense": models.VectorParams(
+        size=dense_size, 
+        distance=models.Distance.COSINE,
+        on_disk=True,
+        hnsw_config=models.HnswConfigDiff(
+            payload_m=16,
+            m=0,
+        )
+    )}
+
+
+def _multi_vectors_config(profile: StorageProfile, multi_size: int) -> dict[str, models.VectorParams]:
+    if get_multi_storage() is MultiStorage.QUERY_TIME:
+        return {}
+    return {"multi": models.VectorParams(
+        size=multi_size,
+        distance=profile.multi_distance,
+        datatype=profile.multi_datatype,
+        multivector_config=models.MultiVectorConfig(
+            comparator=models.MultiVectorComparator.MAX_SIM
+        ),
+        on_disk=True,
+        hnsw_config=models.HnswConfigDiff(m=0)
+    )}
+
+
+def _muvera_vectors_config() -> dict[str, models.VectorParams]:
+    muvera = load_muvera()
+    if muvera is None:
+        return {}
+    # FDE inner products approximate MAX_SIM, so the graph is built on the raw dot product
+    return {"muvera": models.VectorParams(
+        size=muvera.embedding_size,
+        distance=models.Distance.DOT,
+        on_disk=True,
+        hnsw_config=models.HnswConfigDiff(
+            payload_m=16,
+            m=0,
+        )
+    )}
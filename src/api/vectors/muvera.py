@@ -0,0 +1,17 @@
+from enum import Enum
+
+from src.core.config.vector import VectorConfig
+
+
+class MuveraMode(Enum):
+    OFF = "off"
+    PREFETCH = "prefetch"
+    REPLACE_DENSE = "replace_dense"
+
+
+def get_muvera_mode() -> MuveraMode:
+    try:
+        return MuveraMode(VectorConfig.MUVERA_MODE.lower())
+    except ValueError:
+        raise ValueError(f"Unknown MUVERA mode '{VectorConfig.MUVERA_MODE}', "
+                         f"expected one of: {', '.join(mode.value for mode in MuveraMode)}")
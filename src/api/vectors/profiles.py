@@ -0,0 +1,137 @@
+from enum import Enum
+
+import numpy as np
+from numpy import ndarray
+from qdrant_client import models
+
+from src.core.config.vector import VectorConfig
+
+
+# components of unit-length ColBERT vectors stay well inside [-0.5, 0.5]
+_UINT8_OFFSET = 128
+_UINT8_SCALE = 254
+
+
+class StorageProfile(Enum):
+    SCALAR = ("scalar", models.Datatype.FLOAT32, 1.0)
+    SCALAR_F16 = ("scalar", models.Datatype.FLOAT16, 1.0)
+    COMPACT = ("scalar", models.Datatype.UINT8, 1.5)
+    BINARY = ("binary", models.Datatype.FLOAT16, 3.0)
+    PRODUCT = ("product", models.Datatype.FLOAT16, 2.0)
+
+    def __init__(self, quantization: str, multi_datatype: models.Datatype, oversampling: float):
+        self.quantization = quantization
+        self.multi_datatype = multi_datatype
+        self.oversampling = oversampling
+
+
+    @property
+    def multi_distance(self) -> models.Distance:
+        # uint8 vectors can't hold the normalized form cosine would store, and ColBERT vectors are unit length anyway
+        return models.Distance.DOT if self.multi_datatype == models.Datatype.UINT8 else models.Distance.COSINE
+
+
+    def quantization_config(self) -> models.QuantizationConfig:
+        if self.quantization == "binary":
+            return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+        if self.quantization == "product":
+            return models.ProductQuantization(product=models.ProductQuantizationConfig(
+                compression=models.CompressionRatio.X16,
+                always_ram=True,
+            ))
+        return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8,
+            quantile=0.99,
+            always_ram=True,
+        ))
+
+
+    def search_params(self, search_profile: "SearchProfile") -> models.SearchParams:
+        return models.SearchParams(
+            hnsw_ef=search_profile.hnsw_ef,
+            quantization=models.QuantizationSearchParams(
+                rescore=search_profile.rescore,
+                oversampling=self.oversampling * search_profile.oversampling if search_profile.rescore else None,
+            ))
+
+
+    def encode_multi(self, vectors: ndarray) -> ndarray:
+        if self.multi_datatype != models.Datatype.UINT8:
+            return vectors
+        # centering makes every token sum to ~0, so the offset added below contributes the same
+        # constant to every dot product and MAX_SIM ranks stay those of the centered vectors
+        centered = vectors - vectors.mean(axis=-1, keepdims=True)
+        return np.clip(np.rint(_UINT8_OFFSET + centered * _UINT8_SCALE), 0, 255).astype(np.uint8)
+
+
+class SparseBackend(Enum):
+    SPLADE = (True, None)
+    BM25 = (False, models.Modifier.IDF)
+
+    def __init__(self, cacheable: bool, modifier: models.Modifier | None):
+        # tokenizer-only encoders are cheaper to rerun than to look up in the embedding cache
+        self.cacheable = cacheable
+        self.modifier = modifier
+
+
+    @property
+    def model_name(self) -> str:
+        return VectorConfig.BM25_MODEL if self is SparseBackend.BM25 else VectorConfig.SPARSE_MODEL
+
+
+class SearchProfile(Enum):
+    FAST = (40, 0, 32, False, 1.0, 5)
+    BALANCED = (100, 100, 128, True, 1.0, 10)
+    ACCURATE = (300, 200, 256, True, 2.0, 20)
+
+    def __init__(self, prefetch_limit: int, rerank_depth: int, hnsw_ef: int, 
+                 rescore: bool, oversampling: float, limit: int):
+        self.prefetch_limit = prefetch_limit
+        self.rerank_depth = rerank_depth
+        self.hnsw_ef = hnsw_ef
+        self.rescore = rescore
+        self.oversampling = oversampling
+        self.limit = limit
+
+
+    @property
+    def rerank(self) -> bool:
+        return self.rerank_depth > 0
+
+
+class MultiStorage(Enum):
+    STORED = "stored"
+    QUERY_TIME = "query_time"
+
+
+def get_storage_profile() -> StorageProfile:
+    try:
+        return StorageProfile[VectorConfig.STORAGE_PROFILE.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile '{VectorConfig.STORAGE_PROFILE}', "
+                         f"expected one of: {', '.join(profile.name.lower() for profile in StorageProfile)}")
+
+
+def get_multi_storage() -> MultiStorage:
+    try:
+        return MultiStorage(VectorConfig.MULTI_STORAGE.lower())
+    except ValueError:
+        raise ValueError(f"Unknown multivector storage '{VectorConfig.MULTI_STORAGE}', "
+                         f"expected one of: {', '.join(storage.value for storage in MultiStorage)}")
+
+
+def get_sparse_backend() -> SparseBackend:
+    try:
+        return SparseBackend[VectorConfig.SPARSE_BACKEND.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown sparse backend '{VectorConfig.SPARSE_BACKEND}', "
+                         f"expected one of: {', '.join(backend.name.lower() for backend in SparseBackend)}")
+
+
+def get_search_profile(name: str | None, tier: str) -> SearchProfile:
+    name = name or getattr(VectorConfig, f"SEARCH_PROFILE_{tier.upper()}")
+    try:
+        return SearchProfile[name.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown search profile '{name}', "
+                         f"expected one of: {', '.join(profile.name.lower() for profile in SearchProfile)}")
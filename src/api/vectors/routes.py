@@ -1,23 +1,32 @@
+import asyncio
+import json
+
 from pydantic import TypeAdapter
 
 from fastapi import APIRouter, Depends, UploadFile, Security, Form, File
-from fastapi import BackgroundTasks
+from fastapi import BackgroundTasks, Response
+from fastapi.encoders import jsonable_encoder
 
 from src.core.db.unit_of_work import UnitOfWork, get_uow
 from src.api.users.service import UserService
 from src.api.categories.service import CategoryService
 from src.api.documents.service import DocumentService
-from src.api.vectors.service import VectorService, get_querying_vector_service
+from src.api.vectors.service import VectorService, get_querying_vector_service, start_query_embedding
+from src.api.vectors.main import get_query_cache, get_stage_latencies
+from src.api.vectors.deadline import SearchDeadline, StageLatencies
 
 from src.api.documents.schemas import DocumentAdd
 from src.api.users.schemas import UserGet
 from src.api.vectors.schemas import QueryFilters
+from src.api.vectors.profiles import get_search_profile
 
 from src.core.inference.tasks import compute_and_insert_embeddings
+from src.core.config.vector import VectorConfig
 
 from src.core.utils.file_manager import FileManager, get_file_man
 from src.core.utils.mail_manager import MailManager, EmailType, get_mail_man
 from src.core.utils.cache_manager import CacheManager, get_cache_manager
+from src.core.utils.query_cache import QueryEmbeddingCache
 from src.core.utils.url_tokenizer import URLTokenizer, TokenType
 
 from src.auth.dependencies import RoleChecker
@@ -82,22 +91,54 @@ async def embedding_report(ticket: str, body: dict,
 
 
 @vector_router.get("/search")
-async def search(query: str, query_filters: str, 
+async def search(query: str, query_filters: str, response: Response,
+                 profile: str | None = None, budget_ms: float | None = None,
+                 query_embeddings: asyncio.Task = Depends(start_query_embedding),
                  user: UserGet = Security(RoleChecker(["USER", "ADMIN"])), 
                  vector_service: VectorService = Depends(get_querying_vector_service),
-                 uow: UnitOfWork = Depends(get_uow)):
+                 uow: UnitOfWork = Depends(get_uow),
+                 cache_manager: CacheManager = Depends(get_cache_manager),
+                 stage_latencies: StageLatencies = Depends(get_stage_latencies)):
     
     filters = QueryFilters.model_validate_json(query_filters)
     filters.group_uid = user.group.uid
     if filters.only_my_articles:
                 filters.user_uid = user.uid
 
-    query_res = await vector_service.query_db(filters, query)
-    async with uow:
-        doc_service = DocumentService(uow)
-        
-        query_res = await doc_service.extend_document_metadata(query_res)
-
+    try:
+        search_profile = get_search_profile(profile, user.group.tier.value)
+    except ValueError as exc:
+        raise BadRequest(str(exc))
+
+    deadline = SearchDeadline(budget_ms if budget_ms is not None else VectorConfig.SEARCH_BUDGET_MS, 
+                              stage_latencies, search_profile.name.lower())
+
+    cache_key = None
+    if VectorConfig.SEARCH_RESULT_CACHE_SECONDS > 0:
+        with deadline.stage("result_cache") as stage:
+            cache_key = await cache_manager.search_cache_key(query, filters, search_profile.name.lower())
+            cached = await cache_manager.get_cached_search(cache_key)
+            stage["hit"] = cached is not None
+        if cached is not None:
+            response.headers["X-Search-Stages"] = json.dumps(deadline.stages)
+            return cached
+
+    query_res = await vector_service.query_db(filters, query, search_profile, deadline, query_embeddings)
+    with deadline.stage("metadata"):
+        async with uow:
+            doc_service = DocumentService(uow)
+            
+            query_res = await doc_service.extend_document_metadata(query_res)
+
+    # degraded answers are only good for this request's budget, not for the next identical search
+    if cache_key is not None and not deadline.degraded:
+        await cache_manager.set_cached_search(cache_key, jsonable_encoder(query_res), VectorConfig.SEARCH_RESULT_CACHE_SECONDS)
+    response.headers["X-Search-Stages"] = json.dumps(deadline.stages)
     return query_res
 
 
+@vector_router.get("/search/metrics")
+async def search_metrics(user: UserGet = Security(RoleChecker(["ADMIN"])),
+                         query_cache: QueryEmbeddingCache | None = Depends(get_query_cache)):
+
+    return {"query_cache": query_cache.metrics() if query_cache is not None else None}
@@ -1,23 +1,68 @@
-from collections.abc import Iterator
+from collections.abc import Awaitable, Callable, Iterable, Iterator
 import asyncio
-from datetime import datetime
+from uuid import UUID, uuid5
+import logging
+import time
 
 from fastapi import Depends
 from qdrant_client import models, AsyncQdrantClient, QdrantClient
-from qdrant_client.http.models import QueryResponse
+from qdrant_client.http.models import QueryResponse, ScoredPoint
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
 from fastembed import  TextEmbedding, SparseTextEmbedding, LateInteractionTextEmbedding
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from numpy import ndarray
 from uuid6 import uuid7
 
 from src.api.vectors.schemas import QueryFilters
 from src.api.documents.schemas import DocumentAdd
-from src.api.vectors.main import get_querying_client_components
+from src.api.vectors.main import (
+    get_querying_client_components, 
+    ingest_version, 
+    load_chunker, 
+    load_muvera, 
+    query_encoders
+)
+from src.api.vectors.batcher import QueryEmbeddingBatcher, encode_queries
+from src.api.vectors.deadline import SearchDeadline
+from src.api.vectors.encoder import ConcurrentEncoder
+from src.api.vectors.muvera import MuveraMode, get_muvera_mode
+from src.api.vectors.profiles import (
+    MultiStorage, 
+    SearchProfile, 
+    get_multi_storage, 
+    get_sparse_backend, 
+    get_storage_profile
+)
 from src.core.config.vector import VectorConfig
+from src.core.inference.extraction import ExtractionError
+from src.core.utils.embedding_cache import EmbeddingCache, from_arrays, to_arrays
+from src.core.utils.ingest_checkpoint import IngestCheckpoint
+from src.core.utils.lru_cache import LRUCache
+from src.core.utils.query_cache import QueryEmbeddingCache
+from src.core.utils.sparse_pruning import prune_sparse
+from src.core.utils.text_chunker import TokenChunker
+from src.core.utils.token_pooling import pool_tokens
+
+
+logger = logging.getLogger(__name__)
+
+_POINT_NAMESPACE = UUID("0b9a4c1e-5f0e-4a57-9a43-6f2d1c7e8b21")
 
 
 def get_querying_vector_service(args: tuple = Depends(get_querying_client_components)):
-    return VectorService(*args)
+    dense_model, sparse_model, multi_model, client, rerank_cache, query_batcher, query_cache = args
+    return VectorService(dense_model, sparse_model, multi_model, client, 
+                         rerank_cache=rerank_cache, query_batcher=query_batcher, query_cache=query_cache)
+
+
+async def start_query_embedding(query: str, vector_service: "VectorService" = Depends(get_querying_vector_service)):
+    # the query embedding doesn't depend on the user, so it runs while auth and the user lookup resolve
+    task = asyncio.create_task(vector_service._get_query_embeddings(query))
+    # a request that never awaits it (failed auth, cached result) shouldn't leave an unretrieved exception behind
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    try:
+        yield task
+    finally:
+        task.cancel()
 
 
 class VectorService:
@@ -27,96 +72,480 @@ class VectorService:
             dense_model: TextEmbedding,
             sparse_model: SparseTextEmbedding, 
             multi_model: LateInteractionTextEmbedding, 
-            client: AsyncQdrantClient | QdrantClient
+            client: AsyncQdrantClient | QdrantClient,
+            embedding_cache: EmbeddingCache | None = None,
+            chunker: TokenChunker | None = None,
+            checkpoint: IngestCheckpoint | None = None,
+            rerank_cache: LRUCache | None = None,
+            query_batcher: QueryEmbeddingBatcher | None = None,
+            query_cache: QueryEmbeddingCache | None = None
     ):
         self._dense = dense_model
         self._sparse = sparse_model
         self._multi = multi_model
         self._client = client
+        self._embedding_cache = embedding_cache
+        self._chunker = chunker
+        self._checkpoint = checkpoint
+        self._rerank_cache = rerank_cache
+        self._query_batcher = query_batcher
+        self._query_cache = query_cache
+        self._version = ingest_version()
+        self._profile = get_storage_profile()
+        self._multi_storage = get_multi_storage()
+        self._sparse_backend = get_sparse_backend()
+        self._muvera = load_muvera()
+        self._dense_stored = get_muvera_mode() is not MuveraMode.REPLACE_DENSE
+        self._two_phase = VectorConfig.INGEST_TWO_PHASE and self._multi_storage is MultiStorage.STORED
+        self._cache_stats: dict[str, tuple[int, int]] = {}
         self._documents = []
         self._emb_counts = []
+        # keyed by position in _documents, titles are not unique
+        self._failures: dict[int, str] = {}
+        self._failed_doc_ids: list[int] = []
+        self._chunk_totals: dict[int, int] = {}
+        self._uploaded: dict[int, int] = {}
+        self._resumed = 0
         self._succeeded = 0
 
 
-    def upload_embeddings(self, documents: Iterator[tuple[str | None, DocumentAdd]])  -> tuple[list[int | None], list[int | None]]:
-        if isinstance(self._client, QdrantClient):
-            self._client.upload_points(
-                collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
-                points=self._points_generator(documents))
+    def generate_points(self, documents: Iterator[tuple[Iterable[str] | None, DocumentAdd]]) -> Iterator[models.PointStruct]:
+        return self._points_generator(documents)
+
+
+    def upload_points(self, points: list[models.PointStruct], wait: bool = True):
+        if not isinstance(self._client, QdrantClient):
+            raise TypeError("Vector Service initialized with AsyncQdrantClient instead of QdrantClient")
+
+        for attempt in range(VectorConfig.UPLOAD_MAX_RETRIES + 1):
+            try:
+                self._client.upsert(
+                    collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+                    points=points,
+                    wait=wait)
+                return
+            except (ResponseHandlingException, UnexpectedResponse) as exc:
+                if attempt == VectorConfig.UPLOAD_MAX_RETRIES or not is_transient(exc):
+                    raise
+                time.sleep(VectorConfig.UPLOAD_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+
+    def mark_uploaded(self, points: list[models.PointStruct]):
+        uploaded: dict[int, int] = {}
+        for point in points:
+            payload = point.payload or {}
+            if payload.get("doc_id") is not None:
+                uploaded[payload["doc_id"]] = max(uploaded.get(payload["doc_id"], 0), payload["chunk_index"] + 1)
+        self._uploaded.update(uploaded)
+
+        if self._checkpoint is not None:
+            self._checkpoint.mark_uploaded(uploaded)
+
+
+    def is_ingested(self, document: DocumentAdd) -> bool:
+        return self._checkpoint is not None and document.id is not None and self._checkpoint.is_complete(document.id)
+
+
+    def _points_generator(self, documents: Iterator[tuple[Iterable[str] | None, DocumentAdd]]) -> Iterator[models.PointStruct]:
+        batches = (([chunk for chunk, _, _ in batch], batch) for batch in self._chunk_batches(documents))
+
+        if VectorConfig.INGEST_CONCURRENT_MODELS:
+            encoder = ConcurrentEncoder(self._model_encoders(), queue_size=VectorConfig.INGEST_QUEUE_SIZE)
+            embedded = encoder.encode(batches)
+        else:
+            embedded = self._encode_sequentially(batches)
+
+        for batch, vectors in embedded:
+            denses = vectors.get("dense", [None] * len(batch))
+            multis = vectors.get("multi", [None] * len(batch))
+            for (chunk, metadata, index), dense, sparse, multi in zip(batch, denses, vectors["sparse"], multis):
+                point_vectors = {
+                    "sparse":prune_sparse(sparse, VectorConfig.SPARSE_TOP_K, VectorConfig.SPARSE_MIN_WEIGHT).as_object(),
+                }
+                if dense is not None:
+                    point_vectors["dense"] = dense
+                if multi is not None:
+                    point_vectors.update(self._multi_vectors(multi))
+                payload = {"group_uid":metadata.group_uid,
+                    "user_uid":metadata.user_uid,
+                    "created_at":metadata.created_at,
+                    "category_id":metadata.category_id,
+                    "doc_id":metadata.id,
+                    "chunk_index":index,
+                    "chunk_text":chunk}
+                if self._two_phase:
+                    payload["multi_ready"] = False
+                yield models.PointStruct(
+                    id=self._point_id(metadata, index),
+                    payload=payload,
+                    vector=point_vectors # type: ignore 
+                )
 
-        return self._report()
 
+    def _multi_vectors(self, multi: ndarray) -> dict[str, ndarray]:
+        vectors = {"multi": self._profile.encode_multi(pool_tokens(multi, VectorConfig.MULTI_POOL_FACTOR))}
+        if self._muvera is not None:
+            vectors["muvera"] = self._muvera.process_document(multi)
+        return vectors
 
-    def _points_generator(self, documents: Iterator[tuple[str | None, DocumentAdd]]) -> Iterator[models.PointStruct]:
-        for doc, metadata in documents:
-            if doc is None:
-                self._emb_counts.append(0)
-                continue
 
-            chunks = self._construct_chunks(doc)
-            dense_iter = self._dense.query_embed(chunks)
-            sparse_iter = self._sparse.query_embed(chunks)
-            multi_iter = self._multi.query_embed(chunks)
-            self._emb_counts.append(len(chunks))
+    def backfill_multivectors(self, doc_ids: list[int]) -> int:
+        if not isinstance(self._client, QdrantClient):
+            raise TypeError("Vector Service initialized with AsyncQdrantClient instead of QdrantClient")
 
-            for chunk, dense, sparse, multi in zip(chunks, dense_iter, sparse_iter, multi_iter):
-                yield models.PointStruct(
-                    id=uuid7(),
-                    payload = {"group_uid":metadata.group_uid,
-                        "user_uid":metadata.user_uid,
-                        "created_at":metadata.created_at,
-                        "category_id":metadata.category_id,
-                        "doc_id":metadata.id,
-                        "chunk_text":chunk},
-                    vector={
-                        "dense":dense,
-                        "sparse":sparse.as_object(),
-                        "multi":multi
-                    } # type: ignore 
-                )
-            
-            self._documents.append(metadata.title)
+        pending = models.Filter(must=[
+            models.FieldCondition(key="doc_id", match=models.MatchAny(any=doc_ids)),
+            models.FieldCondition(key="multi_ready", match=models.MatchValue(value=False)),
+        ])
+        filled, offset = 0, None
+        while True:
+            records, offset = self._client.scroll(
+                collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+                scroll_filter=pending,
+                limit=VectorConfig.BACKFILL_BATCH_SIZE,
+                offset=offset,
+                with_payload=["chunk_text"],
+                with_vectors=False)
+            if not records:
+                break
+
+            texts = [(record.payload or {}).get("chunk_text", "") for record in records]
+            multis = self._embed(self._multi, VectorConfig.MULTI_MODEL, texts)
+            self._client.update_vectors(
+                collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+                points=[models.PointVectors(id=record.id, vector=self._multi_vectors(multi)) # type: ignore[arg-type]
+                        for record, multi in zip(records, multis)],
+                wait=True)
+            self._client.set_payload(
+                collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+                payload={"multi_ready": True},
+                points=[record.id for record in records],
+                wait=True)
+            filled += len(records)
+            if offset is None:
+                break
+
+        return filled
 
-    def _construct_chunks(self, doc: str) -> list[str]:
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=100,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
 
-        return splitter.split_text(doc)
+    def _point_id(self, metadata: DocumentAdd, index: int) -> UUID:
+        if metadata.id is None:
+            return uuid7()
+        return uuid5(_POINT_NAMESPACE, f"{self._version}:{metadata.id}:{index}")
+
+
+    def _chunk_batches(self, documents: Iterator[tuple[Iterable[str] | None, DocumentAdd]]) -> Iterator[list[tuple[str, DocumentAdd, int]]]:
+        pending: list[tuple[str, DocumentAdd, int]] = []
+
+        for pages, metadata in documents:
+            position = len(self._documents)
+            self._documents.append(metadata.title)
+            if pages is None:
+                self._emb_counts.append(0)
+                self._track_total(metadata, 0)
+                continue
 
+            uploaded, total = 0, None
+            if self._checkpoint is not None and metadata.id is not None:
+                uploaded, total = self._checkpoint.get(metadata.id)
+                self._uploaded[metadata.id] = uploaded
+            if total is not None and uploaded >= total:
+                self._emb_counts.append(total)
+                self._track_total(metadata, total)
+                self._resumed += 1
+                continue
 
-    async def query_db(self, filters: QueryFilters, query: str):
+            chunk_count = 0
+            try:
+                for index, chunk in enumerate(self._construct_chunks(pages)):
+                    chunk_count += 1
+                    if index < uploaded:
+                        continue
+                    pending.append((chunk, metadata, index))
+                    if len(pending) >= VectorConfig.INGEST_BATCH_SIZE:
+                        yield pending
+                        pending = []
+            except Exception as exc:
+                self._record_failure(position, metadata, exc, uploaded=chunk_count > len(pending))
+                pending = [item for item in pending if item[1] is not metadata]
+                chunk_count = 0
+            else:
+                if self._checkpoint is not None and metadata.id is not None:
+                    self._checkpoint.mark_total(metadata.id, chunk_count)
+                self._track_total(metadata, chunk_count)
+            self._emb_counts.append(chunk_count)
+
+        if pending:
+            yield pending
+
+
+    def _record_failure(self, position: int, metadata: DocumentAdd, exc: Exception, uploaded: bool):
+        self._failures[position] = str(exc) if isinstance(exc, ExtractionError) else f"{type(exc).__name__}: {exc}"
+        if uploaded and metadata.id is not None:
+            self._failed_doc_ids.append(metadata.id)
+
+
+    def _track_total(self, metadata: DocumentAdd, total: int):
+        if metadata.id is not None:
+            self._chunk_totals[metadata.id] = total
+
+
+    def _is_complete(self, metadata: DocumentAdd) -> bool:
+        if metadata.id is None or metadata.id not in self._chunk_totals:
+            return False
+        return self._uploaded.get(metadata.id, 0) >= self._chunk_totals[metadata.id]
+
+
+    def fail_documents(self, documents: list[DocumentAdd], exc: Exception):
+        # documents are consumed in order, so the ones past the last started one were never reached;
+        # they are reported as failed but keep their checkpoints, and have no points of this run to remove
+        started = len(self._documents)
+        self._documents += [doc.title for doc in documents[started:]]
+        self._emb_counts += [0] * (len(self._documents) - len(self._emb_counts))
+
+        for i, doc in enumerate(documents):
+            if i in self._failures or self._is_complete(doc):
+                continue
+            self._record_failure(i, doc, exc, uploaded=i < started)
+            self._emb_counts[i] = 0
+
+        try:
+            self.delete_failed_documents()
+        except Exception as cleanup_exc:
+            # most often the error that failed the run in the first place, e.g. Qdrant being unreachable
+            logger.exception("Could not remove the points of failed documents %s", self._failed_doc_ids)
+            for i, doc in enumerate(documents):
+                if doc.id in self._failed_doc_ids and i in self._failures:
+                    self._failures[i] += f" (partial points not removed: {type(cleanup_exc).__name__})"
+
+
+    def delete_failed_documents(self):
+        if not self._failed_doc_ids:
+            return
+        if not isinstance(self._client, QdrantClient):
+            raise TypeError("Vector Service initialized with AsyncQdrantClient instead of QdrantClient")
+
+        self._client.delete(
+            collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+            points_selector=models.FilterSelector(filter=models.Filter(must=[
+                models.FieldCondition(key="doc_id", match=models.MatchAny(any=self._failed_doc_ids))
+            ])),
+            wait=True)
+        if self._checkpoint is not None:
+            self._checkpoint.clear(self._failed_doc_ids)
+
+
+    def _encode_sequentially(self, batches: Iterator[tuple[list[str], list]]) -> Iterator[tuple[list, dict[str, list]]]:
+        encoders = self._model_encoders()
+        for texts, batch in batches:
+            yield batch, {name: encoder(texts) for name, encoder in encoders.items()}
+
+
+    def _model_encoders(self) -> dict[str, Callable[[list[str]], list]]:
+        encoders = {
+            "sparse": lambda texts: self._embed(self._sparse, self._sparse_backend.model_name, texts, 
+                                                cache=self._sparse_backend.cacheable),
+        }
+        if self._dense_stored:
+            encoders["dense"] = lambda texts: self._embed(self._dense, VectorConfig.DENSE_MODEL, texts)
+        if self._multi_storage is MultiStorage.STORED and not self._two_phase:
+            encoders["multi"] = lambda texts: self._embed(self._multi, VectorConfig.MULTI_MODEL, texts)
+        return encoders
+
+
+    def _embed(self, model: TextEmbedding | SparseTextEmbedding | LateInteractionTextEmbedding, 
+               model_name: str, texts: list[str], cache: bool = True) -> list:
+        # no "parallel": fastembed would start a new process pool for every ingest batch, and onnxruntime's
+        # intra-op threads already use every core
+        embed_kwargs = {"batch_size": VectorConfig.EMBED_BATCH_SIZE}
+        if self._embedding_cache is None or not cache:
+            return list(model.embed(texts, **embed_kwargs))
+
+        cached = self._embedding_cache.get_many(model_name, texts)
+        missing = [i for i, arrays in enumerate(cached) if arrays is None]
+        embeddings = [from_arrays(arrays) if arrays is not None else None for arrays in cached]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = list(model.embed(missing_texts, **embed_kwargs))
+            self._embedding_cache.put_many(model_name, missing_texts, [to_arrays(emb) for emb in computed])
+            for i, emb in zip(missing, computed):
+                embeddings[i] = emb
+
+        hits, misses = self._cache_stats.get(model_name, (0, 0))
+        self._cache_stats[model_name] = (hits + len(texts) - len(missing), misses + len(missing))
+        return embeddings
+
+
+    def _construct_chunks(self, pages: Iterable[str]) -> Iterator[str]:
+        if self._chunker is None:
+            self._chunker = load_chunker(self._dense, self._multi)
+
+        return self._chunker.split_stream(pages)
+
+
+    async def query_db(self, filters: QueryFilters, query: str, 
+                       search_profile: SearchProfile = SearchProfile.BALANCED, 
+                       deadline: SearchDeadline | None = None, 
+                       query_embeddings: Awaitable[tuple[ndarray | None, dict, ndarray]] | None = None):
         if not isinstance(self._client, AsyncQdrantClient):
             raise TypeError("Vector Service initialized with QdrantClient instead of AsyncQdrantClient")
+        deadline = deadline or SearchDeadline(None, None, search_profile.name.lower())
         global_filter = self._build_filter(filters)
         
-        dense_query, sparse_query, multi_query = await self._get_query_embeddings(query)
+        with deadline.stage("embed"):
+            dense_query, sparse_query, multi_query = await (query_embeddings if query_embeddings is not None 
+                                                            else self._get_query_embeddings(query))
+
+        search_params = self._profile.search_params(search_profile)
+        prefetch_limit = search_profile.prefetch_limit
 
         hybrid_query = [
-            models.Prefetch(query=dense_query.tolist(), using="dense", limit=100),
-            models.Prefetch(query=models.SparseVector(**sparse_query), using="sparse", limit=100)
+            models.Prefetch(query=models.SparseVector(**sparse_query), using="sparse", limit=prefetch_limit)
         ]
-
+        if dense_query is not None:
+            hybrid_query.append(models.Prefetch(query=dense_query.tolist(), using="dense", 
+                                                limit=prefetch_limit, params=search_params))
+        if self._muvera is not None:
+            hybrid_query.append(models.Prefetch(query=self._muvera.process_query(multi_query).tolist(), 
+                                                using="muvera", limit=prefetch_limit, params=search_params))
+
+        if search_profile.rerank:
+            query_time = self._multi_storage is MultiStorage.QUERY_TIME
+            if not deadline.allows(*(("candidates", "rerank") if query_time else ("rerank",))):
+                deadline.skip("rerank", "budget")
+            elif query_time:
+                return await self._query_time_rerank(hybrid_query, multi_query, global_filter, search_profile, deadline)
+            else:
+                points = await self._stored_rerank(hybrid_query, multi_query, global_filter, 
+                                                   search_params, search_profile, deadline)
+                if points is not None:
+                    return self._process_retrieved_data(QueryResponse(points=points))
+
+        return await self._fused_query(hybrid_query, global_filter, search_profile, deadline)
+
+
+    async def _stored_rerank(self, hybrid_query: list[models.Prefetch], multi_query: ndarray, 
+                             global_filter: models.Filter, search_params: models.SearchParams, 
+                             search_profile: SearchProfile, deadline: SearchDeadline) -> list[ScoredPoint] | None:
         fusion_query = models.Prefetch(
             prefetch=hybrid_query,
             query=models.FusionQuery(fusion=models.Fusion.RRF),
-            limit=100
+            limit=search_profile.rerank_depth
         )
 
-        response = await self._client.query_points(
-            collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
-            prefetch=fusion_query,
-            query=multi_query,
-            using="multi",
-            query_filter=global_filter,
-            limit=10,
-            with_payload=True
+        if self._two_phase:
+            request = self._client.query_points( # type: ignore[union-attr]
+                collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+                prefetch=[
+                    models.Prefetch(prefetch=fusion_query, query=self._profile.encode_multi(multi_query), 
+                                    using="multi", limit=search_profile.limit, params=search_params),
+                    self._pending_backfill_query(hybrid_query, search_profile.limit),
+                ],
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                query_filter=global_filter,
+                limit=search_profile.limit,
+                with_payload=True
+            )
+        else:
+            request = self._client.query_points( # type: ignore[union-attr]
+                collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+                prefetch=fusion_query,
+                query=self._profile.encode_multi(multi_query),
+                using="multi",
+                query_filter=global_filter,
+                search_params=search_params,
+                limit=search_profile.limit,
+                with_payload=True
+            )
+
+        remaining = deadline.remaining_ms()
+        with deadline.stage("rerank", candidates=search_profile.rerank_depth) as stage:
+            try:
+                response = await asyncio.wait_for(request, remaining / 1000 if remaining != float("inf") else None)
+            except TimeoutError:
+                # a slow MAX_SIM pass (e.g. on-disk multivectors under ingest load) gives way to the plain fusion
+                stage["timed_out"] = True
+                deadline.degraded = True
+                return None
+        return response.points
+
+
+    async def _query_time_rerank(self, hybrid_query: list[models.Prefetch], multi_query: ndarray, 
+                                 global_filter: models.Filter, search_profile: SearchProfile, 
+                                 deadline: SearchDeadline) -> list[dict]:
+        with deadline.stage("candidates", candidates=search_profile.rerank_depth):
+            candidates = await self._client.query_points( # type: ignore[misc]
+                collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+                prefetch=hybrid_query,
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                query_filter=global_filter,
+                limit=search_profile.rerank_depth,
+                with_payload=True
+            )
+
+        if not deadline.allows("rerank"):
+            deadline.skip("rerank", "budget")
+            return self._process_retrieved_data(QueryResponse(points=candidates.points[:search_profile.limit]))
+
+        with deadline.stage("rerank", candidates=len(candidates.points)):
+            reranked = await asyncio.to_thread(self.rerank_candidates, multi_query, candidates.points, 
+                                               search_profile.limit)
+        return self._process_retrieved_data(QueryResponse(points=reranked))
+
+
+    async def _fused_query(self, hybrid_query: list[models.Prefetch], global_filter: models.Filter, 
+                           search_profile: SearchProfile, deadline: SearchDeadline) -> list[dict]:
+        prefetch_limit = search_profile.prefetch_limit
+        remaining, estimate = deadline.remaining_ms(), deadline.estimate_ms("fusion")
+        if remaining < estimate:
+            share = max(remaining, 0.0) / estimate if estimate > 0 else 0.0
+            prefetch_limit = max(search_profile.limit, int(prefetch_limit * share))
+        shallow = prefetch_limit < search_profile.prefetch_limit
+        if shallow:
+            deadline.degraded = True
+
+        # shallow runs would drag the estimate of the full-depth fusion down
+        with deadline.stage("fusion", observe=not shallow, prefetch_limit=prefetch_limit):
+            response = await self._client.query_points( # type: ignore[misc]
+                collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+                prefetch=[prefetch.model_copy(update={"limit": prefetch_limit}) for prefetch in hybrid_query],
+                query=models.FusionQuery(fusion=models.Fusion.RRF),
+                query_filter=global_filter,
+                limit=search_profile.limit,
+                with_payload=True
+            )
+        return self._process_retrieved_data(response)
+
+
+    def _pending_backfill_query(self, hybrid_query: list[models.Prefetch], limit: int) -> models.Prefetch:
+        # points still waiting for their multivector can't take part in the MAX_SIM rerank,
+        # so they compete in the final fusion with their dense/sparse ranking instead
+        pending = models.Filter(must=[models.FieldCondition(key="multi_ready", match=models.MatchValue(value=False))])
+        return models.Prefetch(
+            prefetch=[prefetch.model_copy(update={"filter": pending}) for prefetch in hybrid_query],
+            query=models.FusionQuery(fusion=models.Fusion.RRF),
+            filter=pending,
+            limit=limit
         )
 
 
-        return self._process_retrieved_data(response)
+    def rerank_candidates(self, multi_query: ndarray, points: list[ScoredPoint], limit: int = 10) -> list[ScoredPoint]:
+        keys = [point.id for point in points]
+        embeddings = self._rerank_cache.get_many(keys) if self._rerank_cache is not None else [None] * len(points)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        if missing:
+            texts = [(points[i].payload or {}).get("chunk_text", "") for i in missing]
+            computed = list(self._multi.embed(texts, batch_size=VectorConfig.EMBED_BATCH_SIZE))
+            if self._rerank_cache is not None:
+                self._rerank_cache.put_many([keys[i] for i in missing], computed)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+
+        scores = [float((multi_query @ embedding.T).max(axis=1).sum()) for embedding in embeddings]
+        ranked = sorted(zip(scores, points), key=lambda item: item[0], reverse=True)[:limit]
+        return [point.model_copy(update={"score": score}) for score, point in ranked]
 
 
     def _build_filter(self, filters: QueryFilters) -> models.Filter:
@@ -130,7 +559,7 @@ class VectorService:
                 key="created_at",
                 range=models.DatetimeRange(
                     gte=filters.time_frame[0],
-                    lte=filters.time_frame[1] if filters.time_frame[1] else datetime.now())
+                    lte=filters.time_frame[1])
             ),]
 
         if filters.category_id is not None:
@@ -149,14 +578,22 @@ class VectorService:
         )
 
 
-    async def _get_query_embeddings(self, query: str) -> tuple[ndarray, dict, ndarray]:
-        def _helper(query):
-            dense = next(iter(self._dense.query_embed(query)))
-            sparse = next(iter(self._sparse.query_embed(query))).as_object()
-            multi = next(iter(self._multi.query_embed(query))) 
-            return dense, sparse, multi
-        
-        return await asyncio.to_thread(_helper, query)
+    async def _get_query_embeddings(self, query: str) -> tuple[ndarray | None, dict, ndarray]:
+        embeddings = await self._query_cache.get(query) if self._query_cache is not None else None
+        if embeddings is None:
+            start = time.perf_counter()
+            if self._query_batcher is not None:
+                embeddings = await self._query_batcher.embed(query)
+            else:
+                encoders = query_encoders(self._dense, self._sparse, self._multi)
+                batch = await encode_queries(encoders, [query], VectorConfig.QUERY_CONCURRENT_MODELS)
+                embeddings = {name: embedded[0] for name, embedded in batch.items()}
+            if self._query_cache is not None:
+                await self._query_cache.put(query, embeddings, time.perf_counter() - start)
+
+        sparse = prune_sparse(embeddings["sparse"], 
+                              VectorConfig.SPARSE_QUERY_TOP_K, VectorConfig.SPARSE_QUERY_MIN_WEIGHT).as_object()
+        return embeddings.get("dense"), sparse, embeddings["multi"]
 
 
     def _process_retrieved_data(self, response: QueryResponse) -> list[dict]:
@@ -173,10 +610,28 @@ class VectorService:
         return processed
 
     
-    def _report(self) -> tuple[list[int | None], list[int | None]]:
+    def report(self) -> tuple[list[int | None], list[int | None]]:
         return self._documents, self._emb_counts
 
 
+    def failures(self) -> list[str | None]:
+        return [self._failures.get(i) for i in range(len(self._documents))]
+
+
+    def ingest_stats(self) -> dict:
+        return {
+            "cache_hits": sum(hits for hits, _ in self._cache_stats.values()),
+            "cache_misses": sum(misses for _, misses in self._cache_stats.values()),
+            "resumed_documents": self._resumed,
+        }
+
+
+def is_transient(exc: Exception) -> bool:
+    if isinstance(exc, UnexpectedResponse):
+        return exc.status_code is not None and (exc.status_code == 429 or exc.status_code >= 500)
+    return True
+
+
         
 
 
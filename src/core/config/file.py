@@ -4,6 +4,13 @@ class Settings(BaseSettings):
     STORAGE_PATH: str
     DEFAULT_PICTURE_PATH: str
     MIN_CONTEXT_LENGTH: int = 1500
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_QUEUE_PAGES: int = 16
+    # "pdfminer" is faster but emits text in content-stream order instead of reading order
+    PDF_BACKEND: str = "pdfplumber"
+    PDF_SPLIT_PAGES: int = 100
+    EXTRACTION_TIMEOUT_SECONDS: float = 120.0
+    EXTRACTION_MAX_RSS_MB: int = 1024
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -6,8 +6,68 @@ class Settings(BaseSettings):
     DENSE_MODEL: str = "BAAI/bge-small-en"
     DENSE_MODEL_SIZE: int = 384
     SPARSE_MODEL: str = "prithivida/Splade_PP_en_v1"
+    SPARSE_BACKEND: str = "splade"
+    BM25_MODEL: str = "Qdrant/bm25"
+    BM25_AVG_LEN: float = 256.0
     MULTI_MODEL: str = "colbert-ir/colbertv2.0"
     MULTI_MODEL_SIZE: int = 128
+
+    STORAGE_PROFILE: str = "scalar"
+    MULTI_POOL_FACTOR: int = 1
+    MULTI_STORAGE: str = "stored"
+    # a cached ColBERT chunk is tokens x MULTI_MODEL_SIZE float32, about 128 KB at 256 tokens x 128 dims,
+    # so 64 MB holds roughly 500 full-length chunks, five queries' worth of 100 candidates
+    RERANK_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SPARSE_TOP_K: int | None = None
+    SPARSE_MIN_WEIGHT: float = 0.0
+    SPARSE_QUERY_TOP_K: int | None = None
+    SPARSE_QUERY_MIN_WEIGHT: float = 0.0
+
+    QUERY_BATCH_WINDOW_MS: float = 5.0
+    QUERY_BATCH_MAX_SIZE: int = 32
+    QUERY_CONCURRENT_MODELS: bool = True
+    QUERY_CACHE_ITEMS: int = 1024
+    QUERY_CACHE_REDIS: bool = True
+    QUERY_CACHE_EXPIRY_SECONDS: int = 7 * 24 * 60 * 60
+    SEARCH_RESULT_CACHE_SECONDS: int = 10 * 60
+    SEARCH_PROFILE_MINI: str = "fast"
+    SEARCH_PROFILE_NORMAL: str = "balanced"
+    SEARCH_PROFILE_LARGE: str = "accurate"
+    SEARCH_BUDGET_MS: float | None = None
+    SEARCH_STAGE_SMOOTHING: float = 0.2
+
+    MUVERA_MODE: str = "off"
+    MUVERA_K_SIM: int = 4
+    MUVERA_DIM_PROJ: int = 16
+    MUVERA_REPETITIONS: int = 8
+    MUVERA_SEED: int = 42
+
+    CHUNK_MAX_TOKENS: int = 256
+    CHUNK_OVERLAP_TOKENS: int = 32
+
+    INGEST_BATCH_SIZE: int = 256
+    EMBED_BATCH_SIZE: int = 64
+
+    INGEST_CONCURRENT_MODELS: bool = False
+    INGEST_QUEUE_SIZE: int = 2
+    UPLOAD_BATCH_SIZE: int = 64
+    UPLOAD_WORKERS: int = 2
+    UPLOAD_MAX_RETRIES: int = 3
+    UPLOAD_RETRY_BACKOFF_SECONDS: float = 0.5
+    DENSE_MODEL_THREADS: int | None = None
+    SPARSE_MODEL_THREADS: int | None = None
+    MULTI_MODEL_THREADS: int | None = None
+
+    INGEST_TASK_MAX_FILES: int = 16
+    INGEST_TASK_MAX_BYTES: int = 32 * 1024 ** 2
+    INGEST_CHECKPOINT_EXPIRY_SECONDS: int = 24 * 60 * 60
+    INGEST_TASK_MAX_RETRIES: int = 3
+    INGEST_TASK_RETRY_BACKOFF_SECONDS: float = 10.0
+    INGEST_TWO_PHASE: bool = False
+    BACKFILL_BATCH_SIZE: int = 64
+
+    EMBEDDING_CACHE_PATH: str | None = None
+    EMBEDDING_CACHE_MAX_BYTES: int = 2 * 1024 ** 3
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -16,4 +76,3 @@ class Settings(BaseSettings):
 
 VectorConfig = Settings() # type: ignore[arg-type]
 
-
@@ -6,13 +6,23 @@ from celery import Celery
 
 app = Celery('VShare', 
              broker="redis://localhost", 
+             backend="redis://localhost",
              include=["src.core.inference.tasks"],)
 
+# workers started with `-Q celery,backfill` only take multivector backfills when no ingest is waiting
+app.conf.task_routes = {"src.core.inference.tasks.backfill_multivectors": {"queue": "backfill"}}
+app.conf.broker_transport_options = {"queue_order_strategy": "priority"}
+
 
 if TYPE_CHECKING:
     from qdrant_client import QdrantClient
     from qdrant_client.models import SparseTextEmbedding, TextEmbedding, LateInteractionTextEmbedding
     from httpx import Client
+    from redis import Redis
+    from src.core.inference.extraction import ExtractionPool
+    from src.core.utils.embedding_cache import EmbeddingCache
+    from src.core.utils.ingest_checkpoint import IngestCheckpoint
+    from src.core.utils.text_chunker import TokenChunker
 
 dense_model: "TextEmbedding" = None # type: ignore
 sparse_model: "SparseTextEmbedding" = None # type: ignore
@@ -20,5 +30,10 @@ multi_model: "LateInteractionTextEmbedding" = None # type: ignore
 
 client: "QdrantClient" = None # type: ignore
 http_client: "Client" = None # type: ignore
+redis: "Redis" = None # type: ignore
+embedding_cache: "EmbeddingCache | None" = None
+chunker: "TokenChunker" = None # type: ignore
+extraction_pool: "ExtractionPool | None" = None
+checkpoint: "IngestCheckpoint | None" = None
 
 
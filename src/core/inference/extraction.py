@@ -0,0 +1,326 @@
+from collections.abc import Iterator
+from itertools import count
+from multiprocessing import get_context
+from queue import Queue, Empty, Full
+from threading import Event, Lock, Thread
+from typing import Any
+import mmap
+import os
+import time
+
+from src.core.utils.file_manager import FileManager
+
+
+_POLL_SECONDS = 0.5
+
+
+class ExtractionError(Exception):
+    pass
+
+
+# a BaseException so per-document error handling doesn't record a shutdown as a failed document
+class ExtractionStopped(BaseException):
+    pass
+
+
+class _Worker:
+    def __init__(self, context: Any, queue_size: int):
+        self.jobs = context.Queue()
+        # a page range is queue_size pages plus its "ready" and "done" messages, so a worker can finish
+        # a range and take the next job without waiting for the consumer
+        self.results = context.Queue(maxsize=queue_size + 2)
+        self.process = context.Process(target=_worker_loop, args=(self.jobs, self.results, os.getpid()), daemon=True)
+        self.process.start()
+        self.failure: str | None = None
+        self.ready = False
+
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.jobs.close()
+        self.results.close()
+
+
+class ExtractionJob:
+    def __init__(self, pool: "ExtractionPool", worker: _Worker, job_id: int):
+        self._pool = pool
+        self._worker = worker
+        self._id = job_id
+        self._released = False
+        self.waited_seconds = 0.0
+        self.busy_seconds = 0.0
+
+
+    def pages(self, timeout: float, waited: float = 0.0, stop: Event | None = None) -> Iterator[str]:
+        self.waited_seconds = waited
+        clean = False
+        try:
+            for kind, payload in self._messages(timeout, stop):
+                if kind == "page":
+                    yield payload
+                    continue
+                clean = True
+                if kind == "done":
+                    self.busy_seconds = payload
+                    return
+                raise ExtractionError(payload)
+        finally:
+            self.release(clean)
+
+
+    def page_count(self, timeout: float, stop: Event | None = None) -> int | None:
+        clean = False
+        try:
+            for kind, payload in self._messages(timeout, stop):
+                clean = True
+                if kind == "count":
+                    return payload
+                raise ExtractionError(payload)
+        finally:
+            self.release(clean)
+        return None
+
+
+    def _messages(self, timeout: float, stop: Event | None) -> Iterator[tuple[str, Any]]:
+        while True:
+            job_id, kind, payload = self._next_message(timeout, stop)
+            if kind == "ready":
+                self._worker.ready = True
+            if job_id == self._id:
+                yield kind, payload
+
+
+    def release(self, clean: bool = False):
+        if not self._released:
+            self._released = True
+            self._pool.release(self._worker, clean)
+
+
+    def _next_message(self, timeout: float, stop: Event | None) -> tuple[int | None, str, Any]:
+        while True:
+            if stop is not None and stop.is_set():
+                raise ExtractionStopped()
+            start = time.perf_counter()
+            try:
+                message = self._worker.results.get(timeout=_POLL_SECONDS)
+            except Empty:
+                message = None
+                if not self._worker.process.is_alive():
+                    raise ExtractionError(self._worker.failure or
+                                          f"Extraction worker exited with code {self._worker.process.exitcode}")
+            finally:
+                if self._worker.ready:
+                    self.waited_seconds += time.perf_counter() - start
+
+            # checked after every message too, or a file yielding pages faster than the poll interval never times out
+            if self.waited_seconds > timeout:
+                raise ExtractionError(f"Extraction timed out after {timeout:g} seconds")
+            if message is not None:
+                return message
+
+
+class PageStream:
+    def __init__(self, timeout: float, stop: Event | None = None):
+        self._timeout = timeout
+        self._stop = stop
+        self._waited = 0.0
+        self._jobs: Queue = Queue()
+        self._lock = Lock()
+        self._abandoned = False
+        self.jobs: list[ExtractionJob] = []
+
+
+    @property
+    def abandoned(self) -> bool:
+        return self._abandoned
+
+
+    def add(self, job: ExtractionJob):
+        with self._lock:
+            self.jobs.append(job)
+            if not self._abandoned:
+                self._jobs.put(job)
+                return
+        job.release()
+
+
+    def close(self):
+        self._jobs.put(None)
+
+
+    def fail(self, exc: ExtractionError):
+        self._jobs.put(exc)
+
+
+    def pages(self) -> Iterator[str]:
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+                if isinstance(job, ExtractionError):
+                    raise job
+                yield from job.pages(self._timeout, self._waited, self._stop)
+                self._waited = job.waited_seconds
+        finally:
+            self.abandon()
+
+
+    def _next_job(self) -> ExtractionJob | ExtractionError | None:
+        while True:
+            if self._stop is not None and self._stop.is_set():
+                raise ExtractionStopped()
+            try:
+                return self._jobs.get(timeout=_POLL_SECONDS)
+            except Empty:
+                continue
+
+
+    def abandon(self):
+        with self._lock:
+            self._abandoned = True
+            jobs = list(self.jobs)
+        for job in jobs:
+            job.release()
+
+
+class ExtractionPool:
+    def __init__(self, workers: int, queue_size: int, max_rss_mb: int):
+        self._context = get_context("spawn")
+        self._queue_size = queue_size
+        self._max_rss_mb = max_rss_mb
+        self._idle: Queue = Queue()
+        self._workers: set[_Worker] = set()
+        self._lock = Lock()
+        self._ids = count()
+        self._closed = Event()
+
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+        Thread(target=self._supervise, daemon=True).start()
+
+
+    def submit(self, file_path: str, stop: Event, page_range: range | None = None) -> ExtractionJob | None:
+        return self._submit("pages", file_path, stop, page_range)
+
+
+    def page_count(self, file_path: str, stop: Event, timeout: float) -> int | None:
+        # counting can build every page object, so it runs under the same time and memory limits as extraction
+        job = self._submit("count", file_path, stop)
+        return job.page_count(timeout, stop) if job is not None else None
+
+
+    def _submit(self, kind: str, file_path: str, stop: Event, page_range: range | None = None) -> ExtractionJob | None:
+        while not stop.is_set():
+            try:
+                worker = self._idle.get(timeout=_POLL_SECONDS)
+            except Empty:
+                continue
+
+            job_id = next(self._ids)
+            worker.jobs.put((job_id, kind, file_path, page_range))
+            return ExtractionJob(self, worker, job_id)
+        return None
+
+
+    def release(self, worker: _Worker, clean: bool):
+        if clean:
+            self._idle.put(worker)
+            return
+
+        with self._lock:
+            self._workers.discard(worker)
+        worker.kill()
+        if not self._closed.is_set():
+            self._idle.put(self._spawn())
+
+
+    def close(self):
+        with self._lock:
+            self._closed.set()
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.kill()
+
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self._queue_size)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+
+    def _supervise(self):
+        limit = self._max_rss_mb * 1024 * 1024
+        while not self._closed.wait(_POLL_SECONDS):
+            with self._lock:
+                workers = list(self._workers)
+            for worker in workers:
+                rss = _rss_bytes(worker.process.pid)
+                if rss is not None and rss > limit and worker.process.is_alive():
+                    worker.failure = f"Extraction exceeded the {self._max_rss_mb} MB memory limit"
+                    worker.process.kill()
+
+
+def _rss_bytes(pid: int | None) -> int | None:
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * mmap.PAGESIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_loop(jobs: Any, results: Any, parent: int):
+    file_man = FileManager()
+    _send(results, (None, "ready", None), parent)
+
+    while True:
+        job_id, kind, file_path, page_range = _receive(jobs, parent)
+        if kind == "count":
+            try:
+                _send(results, (job_id, "count", file_man.page_count(file_path)), parent)
+            except Exception as exc:
+                _send(results, (job_id, "error", f"{type(exc).__name__}: {exc}"), parent)
+            continue
+
+        busy = 0.0
+        try:
+            pages = file_man.extract_pages(file_path, page_range)
+            while True:
+                start = time.perf_counter()
+                page = next(pages, None)
+                busy += time.perf_counter() - start
+                if page is None:
+                    break
+                _send(results, (job_id, "page", page), parent)
+            _send(results, (job_id, "done", busy), parent)
+        except Exception as exc:
+            _send(results, (job_id, "error", f"{type(exc).__name__}: {exc}"), parent)
+
+
+# a SIGKILLed celery worker (OOM, lost worker) never closes its pool, so the extractors watch for
+# being reparented instead of blocking on the queues forever with the pdf libraries loaded
+def _receive(jobs: Any, parent: int) -> tuple:
+    while True:
+        try:
+            return jobs.get(timeout=_POLL_SECONDS)
+        except Empty:
+            _exit_if_orphaned(parent)
+
+
+def _send(results: Any, message: tuple, parent: int):
+    while True:
+        try:
+            results.put(message, timeout=_POLL_SECONDS)
+            return
+        except Full:
+            _exit_if_orphaned(parent)
+
+
+def _exit_if_orphaned(parent: int):
+    if os.getppid() != parent:
+        # skips the queue feeder threads, which would block flushing into a pipe nobody reads
+        os._exit(0)
@@ -0,0 +1,289 @@
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue, Full, Empty
+from threading import Thread, Event
+from typing import Any
+import logging
+import time
+
+from qdrant_client import models
+
+from src.api.documents.schemas import DocumentAdd
+from src.api.vectors.service import VectorService
+from src.core.inference.extraction import ExtractionError, ExtractionPool, ExtractionStopped, PageStream
+from src.core.utils.file_manager import FileManager
+
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.items = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+        self.max_queue_depth = 0
+
+
+    def sample_queue(self, depth: int):
+        self._depth_total += depth
+        self._depth_samples += 1
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+
+    def as_dict(self) -> dict:
+        return {
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "items": self.items,
+            "avg_queue_depth": round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class IngestPipeline:
+    def __init__(self, file_man: FileManager, vector_service: VectorService, extraction_pool: ExtractionPool | None,
+                 page_queue_size: int, queue_size: int, upload_batch_size: int, upload_workers: int = 1,
+                 extraction_timeout: float = 120.0):
+        self._file_man = file_man
+        self._vector_service = vector_service
+        self._pool = extraction_pool
+        self._page_queue_size = page_queue_size
+        self._extraction_timeout = extraction_timeout
+        self._queue_size = queue_size
+        self._upload_batch_size = upload_batch_size
+        self._upload_workers = upload_workers
+        self._wall_seconds = 0.0
+        self._streams: list[PageStream] = []
+        self._stop = Event()
+        self.stats = {name: StageStats(name) for name in ("extract", "embed", "upload")}
+
+
+    def run(self, files: list[DocumentAdd]):
+        extracted: Queue = Queue(maxsize=self._queue_size)
+        embedded: Queue = Queue(maxsize=self._queue_size)
+
+        threads = [
+            Thread(target=self._guard, args=(self._extract_stage, files, extracted), daemon=True),
+            Thread(target=self._guard, args=(self._embed_stage, extracted, embedded), daemon=True),
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        try:
+            self.upload(self._drain(embedded, self.stats["upload"]))
+            self._vector_service.delete_failed_documents()
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            for stream in self._streams:
+                stream.abandon()
+            self._wall_seconds = time.perf_counter() - start
+            self.stats["extract"].busy_seconds += sum(job.busy_seconds for stream in self._streams for job in stream.jobs)
+            logger.info("Ingest pipeline stats: %s", self.report_stats())
+
+
+    def report_stats(self) -> dict:
+        stats: dict = {name: stage.as_dict() for name, stage in self.stats.items()}
+        stats["wall_seconds"] = round(self._wall_seconds, 3)
+        stats["points_per_second"] = round(self.stats["upload"].items / self._wall_seconds, 1) if self._wall_seconds else 0
+        return stats
+
+
+    def _extract_stage(self, files: list[DocumentAdd], output: Queue):
+        stats = self.stats["extract"]
+
+        if self._pool is None:
+            for file in files:
+                stats.items += 1
+                self._put(output, (self._extract_inline(file), file), stats)
+            return
+
+        for file in files:
+            stats.items += 1
+            stats.sample_queue(output.qsize())
+            if file.storage_path is None or not self._file_man.is_extractable(file.storage_path):
+                self._put(output, (None, file), stats)
+                continue
+            if self._vector_service.is_ingested(file):
+                self._put(output, (iter(()), file), stats)
+                continue
+
+            stream = PageStream(self._extraction_timeout, self._stop)
+            self._streams.append(stream)
+            self._put(output, (stream.pages(), file), stats)
+
+            try:
+                page_ranges: list[range | None] = [None]
+                if self._file_man.is_paginated(file.storage_path):
+                    start = time.perf_counter()
+                    page_count = self._pool.page_count(file.storage_path, self._stop, self._extraction_timeout)
+                    stats.wait_seconds += time.perf_counter() - start
+                    page_ranges = self._file_man.page_ranges(page_count, self._page_queue_size) or [None]
+
+                for page_range in page_ranges:
+                    # every job handed to an abandoned stream is released dirty, which respawns its worker
+                    if stream.abandoned or self._stop.is_set():
+                        break
+                    start = time.perf_counter()
+                    job = self._pool.submit(file.storage_path, self._stop, page_range)
+                    stats.wait_seconds += time.perf_counter() - start
+                    if job is None:
+                        break
+                    stream.add(job)
+            except ExtractionError as exc:
+                stream.fail(exc)
+            finally:
+                stream.close()
+
+
+    def _extract_inline(self, file: DocumentAdd) -> Iterator[str] | None:
+        if file.storage_path is None or not self._file_man.is_extractable(file.storage_path):
+            return None
+        return self._timed_pages(self._file_man.extract_pages(file.storage_path))
+
+
+    def _timed_pages(self, pages: Iterator[str]) -> Iterator[str]:
+        stats = self.stats["extract"]
+        while True:
+            start = time.perf_counter()
+            page = next(pages, None)
+            stats.busy_seconds += time.perf_counter() - start
+            if page is None:
+                return
+            yield page
+
+
+    def _embed_stage(self, extracted: Queue, output: Queue):
+        stats = self.stats["embed"]
+        batch: list[models.PointStruct] = []
+
+        start = time.perf_counter()
+        for point in self._vector_service.generate_points(self._documents(extracted, stats)):
+            if self._stop.is_set():
+                return
+            batch.append(point)
+            stats.items += 1
+            if len(batch) >= self._upload_batch_size:
+                self._put(output, batch, stats)
+                batch = []
+
+        if batch:
+            self._put(output, batch, stats)
+        stats.busy_seconds = time.perf_counter() - start - stats.wait_seconds
+
+
+    def _documents(self, extracted: Queue, stats: StageStats) -> Iterator[tuple[Iterator[str] | None, object]]:
+        for pages, file in self._drain(extracted, stats):
+            if pages is None:
+                yield None, file
+                continue
+            try:
+                yield self._waited(pages, stats), file
+            finally:
+                # a failed document leaves its pages suspended inside a traceback cycle; close them
+                # before moving on so the stream is abandoned and its workers are released right away
+                close = getattr(pages, "close", None)
+                if close is not None:
+                    close()
+
+
+    def _waited(self, pages: Iterator[str], stats: StageStats) -> Iterator[str]:
+        while True:
+            if self._stop.is_set():
+                raise ExtractionStopped()
+            start = time.perf_counter()
+            page = next(pages, None)
+            stats.wait_seconds += time.perf_counter() - start
+            if page is None:
+                return
+            yield page
+
+
+    def upload(self, batches: Iterator[list[models.PointStruct]]):
+        stats = self.stats["upload"]
+        in_flight: deque[tuple[Future, list[models.PointStruct]]] = deque()
+        held: list[models.PointStruct] | None = None
+
+        with ThreadPoolExecutor(max_workers=self._upload_workers) as executor:
+            try:
+                for batch in batches:
+                    if held is not None:
+                        if len(in_flight) >= self._upload_workers:
+                            self._complete_upload(*in_flight.popleft(), stats)
+                        in_flight.append((executor.submit(self._vector_service.upload_points, held, False), held))
+                    held = batch
+
+                while in_flight:
+                    self._complete_upload(*in_flight.popleft(), stats)
+                if held is not None:
+                    # updates are applied in order, so waiting for the last batch waits for all of them
+                    self._complete_upload(executor.submit(self._vector_service.upload_points, held, True), held, stats)
+            finally:
+                for future, _ in in_flight:
+                    future.cancel()
+
+
+    def _complete_upload(self, future: Future, batch: list[models.PointStruct], stats: StageStats):
+        start = time.perf_counter()
+        future.result()
+        stats.busy_seconds += time.perf_counter() - start
+        stats.items += len(batch)
+        self._vector_service.mark_uploaded(batch)
+
+
+    def _drain(self, queue: Queue, stats: StageStats) -> Iterator[Any]:
+        while True:
+            stats.sample_queue(queue.qsize())
+            start = time.perf_counter()
+            item = self._get(queue)
+            stats.wait_seconds += time.perf_counter() - start
+
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+
+
+    def _guard(self, stage, source: Any, output: Queue):
+        try:
+            stage(source, output)
+        except BaseException as exc:
+            self._put(output, _Failure(exc))
+        finally:
+            self._put(output, _DONE)
+
+
+    def _put(self, queue: Queue, item: Any, stats: StageStats | None = None):
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                break
+            except Full:
+                continue
+        if stats is not None:
+            stats.wait_seconds += time.perf_counter() - start
+
+
+    def _get(self, queue: Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return queue.get(timeout=0.1)
+            except Empty:
+                continue
+        return _DONE
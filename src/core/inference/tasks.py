@@ -1,25 +1,73 @@
+from multiprocessing import current_process
+import logging
+import os
+
 import httpx
+from redis import Redis
 from httpx import RequestError, HTTPStatusError
-from celery import Task
-from celery.signals import worker_process_init
+from celery import Task, chord
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from celery.signals import celeryd_after_setup, worker_process_init, worker_process_shutdown
 
 
 from src.core.inference.celery import app
 import src.core.inference.celery as global_store
-from src.api.vectors.main import init_client, load_dense_model, load_sparse_model, load_multivector_model
-from src.api.vectors.service import VectorService
+from src.api.vectors.main import (
+    init_client, 
+    init_embedding_cache, 
+    init_ingest_checkpoint,
+    load_chunker, 
+    load_dense_model, 
+    load_sparse_model, 
+    load_multivector_model
+)
+from src.api.vectors.service import VectorService, is_transient
 from src.api.documents.schemas import DocumentAdd
+from src.core.inference.extraction import ExtractionPool
+from src.core.inference.pipeline import IngestPipeline
+from src.core.utils.cache_manager import search_generation_key
 from src.core.utils.file_manager import get_file_man
+from src.core.config.file import FileConfig
+from src.core.config.vector import VectorConfig
+from src.core.config.db import DBConfig
+
+
+logger = logging.getLogger(__name__)
+
+
+@celeryd_after_setup.connect
+def check_backfill_queue(sender, instance, **kwargs):
+    queues = instance.app.amqp.queues
+    if VectorConfig.INGEST_TWO_PHASE and "backfill" not in set(queues.consume_from or queues):
+        logger.warning("INGEST_TWO_PHASE is on, but worker %s does not consume the 'backfill' queue: ColBERT vectors "
+                       "stay missing unless some worker is started with `-Q celery,backfill`", sender)
 
 
 @worker_process_init.connect
 def init_worker(**kwargs):
+    # pool workers are daemonic, which would forbid the extraction process pool
+    current_process()._config["daemon"] = False # type: ignore[attr-defined]
+
     global_store.client = init_client()    
     global_store.http_client = httpx.Client(timeout=10.0)
+    global_store.redis = Redis.from_url(DBConfig.REDIS_URL, decode_responses=True)
 
     global_store.dense_model = load_dense_model()
     global_store.sparse_model = load_sparse_model()
     global_store.multi_model = load_multivector_model()
+    global_store.embedding_cache = init_embedding_cache()
+    global_store.chunker = load_chunker(global_store.dense_model, global_store.multi_model)
+    global_store.checkpoint = init_ingest_checkpoint()
+    if FileConfig.EXTRACTION_WORKERS > 0:
+        global_store.extraction_pool = ExtractionPool(FileConfig.EXTRACTION_WORKERS,
+                                                      FileConfig.EXTRACTION_QUEUE_PAGES,
+                                                      FileConfig.EXTRACTION_MAX_RSS_MB)
+
+
+@worker_process_shutdown.connect
+def shutdown_worker(**kwargs):
+    if global_store.extraction_pool is not None:
+        global_store.extraction_pool.close()
 
 
 @app.task(autoretry_for=(RequestError, HTTPStatusError), retry_backoff=True)
@@ -32,19 +80,116 @@ def send_request(url: str, body: dict | None = None):
 
 @app.task
 def compute_and_insert_embeddings(files_to_embed: list[dict], request_url: str):
+    subtasks = [embed_documents.s(bucket) for bucket in _bucket_files(files_to_embed)]
+    chord(subtasks)(send_embedding_report.s(request_url))
+
+
+@app.task(bind=True, acks_late=True, reject_on_worker_lost=True, max_retries=VectorConfig.INGEST_TASK_MAX_RETRIES)
+def embed_documents(self: Task, files_to_embed: list[dict]) -> dict:
     fs = get_file_man()
     files_to_embed_objects = [DocumentAdd(**file) for file in files_to_embed]
-    documents = fs.extract_text_from_files(files_to_embed_objects)
     
     vector_service = VectorService(global_store.dense_model, 
                                     global_store.sparse_model, 
                                     global_store.multi_model, 
-                                    global_store.client)
-    documents, emb_counts = vector_service.upload_embeddings(documents)
+                                    global_store.client,
+                                    global_store.embedding_cache,
+                                    global_store.chunker,
+                                    global_store.checkpoint)
+    pipeline = IngestPipeline(fs, vector_service, global_store.extraction_pool,
+                              page_queue_size=FileConfig.EXTRACTION_QUEUE_PAGES,
+                              queue_size=VectorConfig.INGEST_QUEUE_SIZE,
+                              upload_batch_size=VectorConfig.UPLOAD_BATCH_SIZE,
+                              upload_workers=VectorConfig.UPLOAD_WORKERS,
+                              extraction_timeout=FileConfig.EXTRACTION_TIMEOUT_SECONDS)
+    try:
+        pipeline.run(files_to_embed_objects)
+    except Exception as exc:
+        if (isinstance(exc, (ResponseHandlingException, UnexpectedResponse)) and is_transient(exc)
+                and self.request.retries < self.max_retries): # type: ignore[operator]
+            # checkpoints and deterministic point ids let the retry skip or overwrite what was uploaded
+            raise self.retry(exc=exc, countdown=VectorConfig.INGEST_TASK_RETRY_BACKOFF_SECONDS * 2 ** self.request.retries)
+        vector_service.fail_documents(files_to_embed_objects, exc)
+    documents, emb_counts = vector_service.report()
+
+    group_uids = sorted({str(doc.group_uid) for doc in files_to_embed_objects if doc.group_uid is not None})
+    try:
+        _bump_search_generations(group_uids)
+    except Exception:
+        # the chord needs this bucket's report, stale cached searches only last SEARCH_RESULT_CACHE_SECONDS
+        logger.exception("Could not invalidate cached searches of groups %s", group_uids)
 
-    body = {
+    if VectorConfig.INGEST_TWO_PHASE:
+        doc_ids = [doc.id for doc in files_to_embed_objects if doc.id is not None]
+        if doc_ids:
+            backfill_multivectors.delay(doc_ids, group_uids)
+
+    return {
         "documents":documents,
-        "emb_counts": emb_counts
+        "emb_counts": emb_counts,
+        "failures": vector_service.failures(),
+        **vector_service.ingest_stats(),
+        "pipeline": pipeline.report_stats()
     }
+
+
+@app.task(acks_late=True, reject_on_worker_lost=True,
+          autoretry_for=(ResponseHandlingException, UnexpectedResponse), retry_backoff=True)
+def backfill_multivectors(doc_ids: list[int], group_uids: list[str] | None = None) -> int:
+    vector_service = VectorService(global_store.dense_model, 
+                                    global_store.sparse_model, 
+                                    global_store.multi_model, 
+                                    global_store.client,
+                                    global_store.embedding_cache,
+                                    global_store.chunker)
+    backfilled = vector_service.backfill_multivectors(doc_ids)
+    if backfilled:
+        # reranked scores replace fusion-only ones, so cached results of these groups are stale
+        _bump_search_generations(group_uids or [])
+    return backfilled
+
+
+@app.task
+def send_embedding_report(results: list[dict], request_url: str):
+    body = {"documents": [], "emb_counts": [], "failures": [],
+            "cache_hits": 0, "cache_misses": 0, "resumed_documents": 0, "pipeline": []}
+
+    for result in results:
+        body["documents"] += result["documents"]
+        body["emb_counts"] += result["emb_counts"]
+        body["failures"] += result["failures"]
+        body["cache_hits"] += result["cache_hits"]
+        body["cache_misses"] += result["cache_misses"]
+        body["resumed_documents"] += result["resumed_documents"]
+        body["pipeline"].append(result["pipeline"])
+
     send_request.delay(request_url, body)
 
+
+def _bump_search_generations(group_uids: list[str]):
+    if not group_uids:
+        return
+    pipe = global_store.redis.pipeline(transaction=False)
+    for group_uid in group_uids:
+        pipe.incr(search_generation_key(group_uid))
+    pipe.execute()
+
+
+def _bucket_files(files: list[dict]) -> list[list[dict]]:
+    buckets: list[list[dict]] = []
+    bucket: list[dict] = []
+    bucket_bytes = 0
+
+    for file in files:
+        path = file.get("storage_path")
+        size = os.path.getsize(path) if path and os.path.exists(path) else 0
+        if bucket and (len(bucket) >= VectorConfig.INGEST_TASK_MAX_FILES or
+                       bucket_bytes + size > VectorConfig.INGEST_TASK_MAX_BYTES):
+            buckets.append(bucket)
+            bucket, bucket_bytes = [], 0
+        bucket.append(file)
+        bucket_bytes += size
+
+    if bucket:
+        buckets.append(bucket)
+    return buckets
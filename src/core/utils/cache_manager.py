@@ -1,14 +1,27 @@
+from hashlib import blake2b
+import json
+
 from redis.asyncio import Redis, ConnectionPool
 from fastapi import Request, Depends
 
 from src.core.config.db import DBConfig
 from src.api.categories.schemas import CategoryGet
+from src.api.vectors.schemas import QueryFilters
 
 
 def init_redis() -> Redis:
     pool = ConnectionPool.from_url(DBConfig.REDIS_URL, decode_responses=True)
     return Redis(connection_pool=pool)
 
+def init_binary_redis(redis: Redis) -> Redis:
+    # same server and settings as the text client, but replies stay bytes for packed vectors
+    kwargs = {**redis.connection_pool.connection_kwargs, "decode_responses": False}
+    pool = ConnectionPool(connection_class=redis.connection_pool.connection_class, **kwargs)
+    return Redis(connection_pool=pool)
+
+def search_generation_key(group_uid: str) -> str:
+    return f"search-generation:{group_uid}"
+
 def get_redis(request: Request) -> Redis:
     return request.app.state.redis
 
@@ -47,4 +60,28 @@ class CacheManager:
 
 
     async def set_cached_categories(self, group_uid: str, categories: dict):
-        await self._redis.hset(f"categories:{group_uid}", mapping=categories) # type: ignore[reportGeneralTypeIssues]
\ No newline at end of file
+        await self._redis.hset(f"categories:{group_uid}", mapping=categories) # type: ignore[reportGeneralTypeIssues]
+
+
+    async def bump_search_generation(self, group_uid: str):
+        await self._redis.incr(search_generation_key(group_uid))
+
+
+    async def search_cache_key(self, query: str, filters: QueryFilters, search_profile: str) -> str:
+        group_uid = str(filters.group_uid)
+        generation = await self._redis.get(search_generation_key(group_uid)) or "0"
+        canonical = filters.model_copy(update={
+            "category_id": sorted(set(filters.category_id)) if filters.category_id is not None else None
+        })
+        normalized = " ".join(query.casefold().split())
+        digest = blake2b(f"{normalized}\n{canonical.model_dump_json()}".encode(), digest_size=16).hexdigest()
+        return f"search:{group_uid}:{generation}:{search_profile}:{digest}"
+
+
+    async def get_cached_search(self, key: str) -> list[dict] | None:
+        cached = await self._redis.get(key)
+        return json.loads(cached) if cached is not None else None
+
+
+    async def set_cached_search(self, key: str, results: list[dict], expiry_seconds: int):
+        await self._redis.set(key, json.dumps(results), ex=expiry_seconds)
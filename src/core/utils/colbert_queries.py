@@ -0,0 +1,39 @@
+from collections import defaultdict
+
+import numpy as np
+from numpy import ndarray
+from fastembed import LateInteractionTextEmbedding
+from fastembed.common.onnx_model import OnnxOutputContext
+from fastembed.late_interaction.colbert import Colbert
+
+
+def embed_colbert_queries(multi_model: LateInteractionTextEmbedding, texts: list[str]) -> list[ndarray]:
+    colbert = getattr(multi_model, "model", None)
+    if not isinstance(colbert, Colbert):
+        return list(multi_model.query_embed(texts))
+    if colbert.model is None:
+        colbert.load_onnx_model()
+
+    # Colbert.query_embed runs the model once per query; queries padded to the same length
+    # (MIN_QUERY_LENGTH covers most of them) give the same vectors in one run as alone
+    encoded = colbert.query_tokenizer.encode_batch(texts) # type: ignore[union-attr]
+    by_length: dict[int, list[int]] = defaultdict(list)
+    for i, encoding in enumerate(encoded):
+        by_length[len(encoding.ids)].append(i)
+
+    embeddings: list[ndarray] = [None] * len(texts) # type: ignore[list-item]
+    input_names = {node.name for node in colbert.model.get_inputs()} # type: ignore[union-attr]
+    for indices in by_length.values():
+        input_ids = np.array([encoded[i].ids for i in indices], dtype=np.int64)
+        onnx_input = {"input_ids": input_ids}
+        if "attention_mask" in input_names:
+            onnx_input["attention_mask"] = np.array([encoded[i].attention_mask for i in indices], dtype=np.int64)
+        if "token_type_ids" in input_names:
+            onnx_input["token_type_ids"] = np.zeros_like(input_ids)
+        onnx_input = colbert._preprocess_onnx_input(onnx_input, is_doc=False)
+        output = OnnxOutputContext(model_output=colbert._run_model(onnx_input, colbert.ONNX_OUTPUT_NAMES),
+                                   attention_mask=onnx_input.get("attention_mask"),
+                                   input_ids=onnx_input["input_ids"])
+        for i, embedding in zip(indices, colbert._post_process_onnx_output(output, is_doc=False)):
+            embeddings[i] = embedding
+    return embeddings
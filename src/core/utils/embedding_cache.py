@@ -0,0 +1,166 @@
+from collections.abc import Sequence
+from hashlib import blake2b
+from pathlib import Path
+import sqlite3
+import struct
+import threading
+import time
+
+import numpy as np
+from fastembed import SparseEmbedding
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    key BLOB NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL,
+    PRIMARY KEY (model, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_used_at ON embeddings (used_at);
+"""
+
+_EVICTION_CHECK_BYTES = 16 * 1024 * 1024
+_EVICTION_TARGET = 0.9
+
+
+def pack_arrays(arrays: Sequence[np.ndarray]) -> bytes:
+    parts = [struct.pack("<B", len(arrays))]
+    for array in arrays:
+        if np.issubdtype(array.dtype, np.floating):
+            array = array.astype(np.float16)
+        array = np.ascontiguousarray(array)
+        dtype = array.dtype.str.encode()
+        parts.append(struct.pack("<B", len(dtype)) + dtype)
+        parts.append(struct.pack(f"<B{array.ndim}I", array.ndim, *array.shape))
+        parts.append(array.tobytes())
+    return b"".join(parts)
+
+
+def unpack_arrays(data: bytes) -> tuple[np.ndarray, ...]:
+    arrays = []
+    (count,), offset = struct.unpack_from("<B", data), 1
+    for _ in range(count):
+        (dtype_len,) = struct.unpack_from("<B", data, offset)
+        dtype = np.dtype(data[offset + 1:offset + 1 + dtype_len].decode())
+        offset += 1 + dtype_len
+
+        (ndim,) = struct.unpack_from("<B", data, offset)
+        shape = struct.unpack_from(f"<{ndim}I", data, offset + 1)
+        offset += 1 + 4 * ndim
+
+        size = int(np.prod(shape)) * dtype.itemsize
+        array = np.frombuffer(data, dtype=dtype, count=size // dtype.itemsize, offset=offset).reshape(shape)
+        arrays.append(array.astype(np.float32) if dtype == np.float16 else array)
+        offset += size
+    return tuple(arrays)
+
+
+def to_arrays(embedding: np.ndarray | SparseEmbedding) -> tuple[np.ndarray, ...]:
+    if isinstance(embedding, SparseEmbedding):
+        return embedding.indices, embedding.values
+    return (embedding,)
+
+
+def from_arrays(arrays: tuple[np.ndarray, ...]) -> np.ndarray | SparseEmbedding:
+    if len(arrays) == 2:
+        return SparseEmbedding(indices=arrays[0], values=arrays[1])
+    return arrays[0]
+
+
+class EmbeddingCache:
+    def __init__(self, path: str | Path, max_bytes: int):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+        self._written = 0
+        self._lock = threading.Lock()
+
+        self._connection().executescript(_SCHEMA)
+
+
+    def get_many(self, model: str, texts: Sequence[str]) -> list[tuple[np.ndarray, ...] | None]:
+        keys = [self._key(text) for text in texts]
+        conn = self._connection()
+
+        found: dict[bytes, bytes] = {}
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, value FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(part))})",
+                (model, *part)
+            ).fetchall()
+            found.update(rows)
+
+        if found:
+            hit_keys = list(found)
+            now = time.time()
+            with conn:
+                conn.executemany("UPDATE embeddings SET used_at = ? WHERE model = ? AND key = ?",
+                                 [(now, model, key) for key in hit_keys])
+
+        return [unpack_arrays(found[key]) if key in found else None for key in keys]
+
+
+    def put_many(self, model: str, texts: Sequence[str], values: Sequence[Sequence[np.ndarray]]):
+        now = time.time()
+        rows = []
+        for text, arrays in zip(texts, values):
+            blob = pack_arrays(arrays)
+            rows.append((model, self._key(text), blob, len(blob), now))
+
+        conn = self._connection()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+
+        with self._lock:
+            self._written += sum(row[3] for row in rows)
+            should_check = self._written >= _EVICTION_CHECK_BYTES
+            if should_check:
+                self._written = 0
+
+        if should_check:
+            self._evict()
+
+
+    def _evict(self):
+        conn = self._connection()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+
+        target = int(self._max_bytes * _EVICTION_TARGET)
+        while total > target:
+            rows = conn.execute("SELECT model, key, size FROM embeddings ORDER BY used_at LIMIT 1000").fetchall()
+            if not rows:
+                break
+
+            batch, freed = [], 0
+            for model, key, size in rows:
+                batch.append((model, key))
+                freed += size
+                if total - freed <= target:
+                    break
+
+            with conn:
+                conn.executemany("DELETE FROM embeddings WHERE model = ? AND key = ?", batch)
+            total -= freed
+
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={self._max_bytes}")
+            self._local.conn = conn
+        return conn
+
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return blake2b(text.encode(), digest_size=16).digest()
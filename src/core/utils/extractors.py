@@ -0,0 +1,190 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import pdfplumber
+from docx import Document
+from odf.opendocument import load
+from odf.text import P
+from pdfminer.pdfdevice import PDFDevice
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+
+
+# gaps are measured in thousandths of an em, like TJ offsets; one wider than this is treated as a word break
+_WORD_GAP = 200
+# moving back more than this along the same baseline (a new column or table cell) also separates words
+_WORD_BACKTRACK = 1000
+# vertical moves smaller than this fraction of the font size (sub/superscripts) stay on the same line
+_LINE_BREAK = 0.7
+
+
+class Extractor(ABC):
+    extensions: tuple[str, ...] = ()
+    paginated = False
+
+    @abstractmethod
+    def extract(self, path: Path, pages: range | None = None) -> Iterator[str]:
+        ...
+
+
+    def page_count(self, path: Path) -> int | None:
+        return None
+
+
+class PdfPlumberExtractor(Extractor):
+    extensions = ("pdf",)
+    paginated = True
+
+    def extract(self, path: Path, pages: range | None = None) -> Iterator[str]:
+        with pdfplumber.open(path, pages=[number + 1 for number in pages] if pages is not None else None) as pdf:
+            for page in pdf.pages:
+                text = page.extract_text()
+                page.close()
+                if text:
+                    yield text
+
+
+    def page_count(self, path: Path) -> int | None:
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+
+
+class PdfMinerExtractor(Extractor):
+    extensions = ("pdf",)
+    paginated = True
+
+    def extract(self, path: Path, pages: range | None = None) -> Iterator[str]:
+        resources = PDFResourceManager(caching=True)
+        device = _TextDevice(resources)
+        interpreter = PDFPageInterpreter(resources, device)
+
+        with open(path, "rb") as file:
+            for page in PDFPage.get_pages(file, pagenos=pages, maxpages=pages.stop if pages is not None else 0):
+                interpreter.process_page(page)
+                text = device.flush().strip()
+                if text:
+                    yield text
+
+
+    def page_count(self, path: Path) -> int | None:
+        with open(path, "rb") as file:
+            document = PDFDocument(PDFParser(file))
+            return resolve1(document.catalog["Pages"]).get("Count")
+
+
+class _TextDevice(PDFDevice):
+    def __init__(self, resources: PDFResourceManager):
+        super().__init__(resources)
+        self._parts: list[str] = []
+        self._matrix: tuple | None = None
+        # where the previous string ended, in text space units from the origin of its text matrix
+        self._advance = 0.0
+
+
+    def flush(self) -> str:
+        text = "".join(self._parts)
+        self._parts = []
+        self._matrix = None
+        self._advance = 0.0
+        return text
+
+
+    def render_string(self, textstate, seq, ncs, graphicstate):
+        matrix = textstate.matrix
+        if self._matrix is not None and matrix != self._matrix:
+            self._separate_from_previous(textstate)
+            self._advance = 0.0
+        self._matrix = matrix
+
+        font = textstate.font
+        scaling = textstate.scaling * 0.01
+        size = textstate.fontsize * scaling
+        for item in seq:
+            if isinstance(item, (int, float)):
+                if item < -_WORD_GAP:
+                    self._separate(" ")
+                self._advance -= item * 0.001 * size
+                continue
+            for cid in font.decode(item):
+                try:
+                    self._parts.append(font.to_unichr(cid))
+                except PDFUnicodeNotDefined:
+                    pass
+                self._advance += font.char_width(cid) * size + textstate.charspace * scaling
+                if cid == 32 and not font.is_multibyte():
+                    self._advance += textstate.wordspace * scaling
+
+
+    def _separate_from_previous(self, textstate):
+        matrix, previous = textstate.matrix, self._matrix
+        line_height = abs(textstate.fontsize * matrix[3]) or 1
+        if abs(matrix[5] - previous[5]) > _LINE_BREAK * line_height: # type: ignore[index]
+            self._separate("\n")
+            return
+
+        # the gap between where the previous string ended and where this one starts, in thousandths of an em
+        em = abs(textstate.fontsize * matrix[0]) or 1
+        end = previous[4] + self._advance * previous[0] # type: ignore[index]
+        gap = (matrix[4] - end) / em * 1000
+        if gap > _WORD_GAP or gap < -_WORD_BACKTRACK:
+            self._separate(" ")
+
+
+    def _separate(self, separator: str):
+        if self._parts and not self._parts[-1].isspace():
+            self._parts.append(separator)
+        elif self._parts and separator == "\n":
+            self._parts[-1] = separator
+
+
+class DocxExtractor(Extractor):
+    extensions = ("docx",)
+
+    def extract(self, path: Path, pages: range | None = None) -> Iterator[str]:
+        doc = Document(str(path))
+
+        paragraphs = (p.text.strip() for p in doc.paragraphs)
+
+        return group_paragraphs(p for p in paragraphs if p)
+
+
+class OdtExtractor(Extractor):
+    extensions = ("odt",)
+
+    def extract(self, path: Path, pages: range | None = None) -> Iterator[str]:
+        doc = load(path)
+
+        paragraphs = ("".join(node.data for node in p.childNodes if node.nodeType == 3).strip()
+                      for p in doc.getElementsByType(P))
+
+        return group_paragraphs(p for p in paragraphs if p)
+
+
+PDF_BACKENDS: dict[str, type[Extractor]] = {
+    "pdfplumber": PdfPlumberExtractor,
+    "pdfminer": PdfMinerExtractor,
+}
+
+
+def get_extractors(pdf_backend: str) -> list[Extractor]:
+    if pdf_backend not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{pdf_backend}', expected one of: {', '.join(PDF_BACKENDS)}")
+
+    return [PDF_BACKENDS[pdf_backend](), DocxExtractor(), OdtExtractor()]
+
+
+def group_paragraphs(paragraphs: Iterable[str], section_chars: int = 16 * 1024) -> Iterator[str]:
+    section, size = [], 0
+    for paragraph in paragraphs:
+        section.append(paragraph)
+        size += len(paragraph)
+        if size >= section_chars:
+            yield "\n".join(section)
+            section, size = [], 0
+    if section:
+        yield "\n".join(section)
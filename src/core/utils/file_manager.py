@@ -3,24 +3,20 @@ from pathlib import Path
 import shutil
 import os
 
-import pdfplumber
-from odf.opendocument import load
-from odf.text import P
-from docx import Document
 from fastapi import UploadFile
 from uuid6 import uuid7
 
-from src.api.documents.schemas import DocumentAdd
 from src.core.config.file import FileConfig
+from src.core.utils.extractors import Extractor, get_extractors
 
 
 class FileManager:
-    def __init__(self, save_path: str = FileConfig.STORAGE_PATH):
+    def __init__(self, save_path: str = FileConfig.STORAGE_PATH, pdf_backend: str = FileConfig.PDF_BACKEND):
         self._save_path = Path(save_path)
-        self._extractors = {
-            "pdf": self._extract_pdf,
-            "odt": self._extract_odt,
-            "docx": self._extract_docx
+        self._extractors: dict[str, Extractor] = {
+            extension: extractor
+            for extractor in get_extractors(pdf_backend)
+            for extension in extractor.extensions
         }
         self._allowed_extensions = set(self._extractors.keys())
 
@@ -43,62 +39,34 @@ class FileManager:
                 return str(dest)
     
 
-    def extract_text_from_files(self, files: list[DocumentAdd]) -> Iterator[tuple[str | None, DocumentAdd]]:
-        for file in files:
-            if file.storage_path is not None:
-                extension = Path(file.storage_path).suffix.lstrip(".")
-                extractor = self._extractors.get(extension)
-                if extractor is not None:
-                    yield extractor(file.storage_path), file
-            else:
-                yield None, file
+    def is_extractable(self, file_path: str) -> bool:
+        return Path(file_path).suffix.lstrip(".") in self._extractors
 
 
-    def _extract_pdf(self, file_path: str | Path) -> str:
-        path = Path(file_path) 
+    def extract_pages(self, file_path: str, page_range: range | None = None) -> Iterator[str]:
+        # a generator, so a missing or unreadable file fails on its first page, inside its own document
+        path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(path)
 
-        content = []
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() 
-                if text:
-                    content.append(text)   
-        
-        return " ".join(content)
-
+        yield from self._extractors[path.suffix.lstrip(".")].extract(path, page_range)
 
-    def _extract_docx(self, file_path: str) -> str:
-        path = Path(file_path) 
-        if not path.exists():
-            raise FileNotFoundError(path)
-        
-        doc = Document(file_path)
-        
-        paragraphs = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
-        
-        return " ".join(paragraphs)
 
+    def is_paginated(self, file_path: str) -> bool:
+        extractor = self._extractors.get(Path(file_path).suffix.lstrip("."))
+        return extractor is not None and extractor.paginated
 
 
-    def _extract_odt(self, file_path: str | Path) -> str:
-        path = Path(file_path) 
-        if not path.exists():
-            raise FileNotFoundError(path)
-        
-        doc = load(path)
+    def page_count(self, file_path: str) -> int | None:
+        path = Path(file_path)
+        return self._extractors[path.suffix.lstrip(".")].page_count(path)
 
-        content = []
-        for p in doc.getElementsByType(P):
-            text = "".join(node.data for node in p.childNodes if node.nodeType == 3).strip()
-            if text:
-                content.append(text)
 
-        return " ".join(content)
+    def page_ranges(self, page_count: int | None, range_pages: int) -> list[range] | None:
+        if page_count is None or page_count <= FileConfig.PDF_SPLIT_PAGES:
+            return None
+        return [range(start, min(start + range_pages, page_count)) for start in range(0, page_count, range_pages)]
 
 
 def get_file_man() -> FileManager:
     return FileManager()
-
-
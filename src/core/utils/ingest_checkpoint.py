@@ -0,0 +1,45 @@
+from hashlib import blake2b
+
+from redis import Redis
+
+
+class IngestCheckpoint:
+    def __init__(self, redis: Redis, version: str, expiry_seconds: int):
+        self._redis = redis
+        self._version = blake2b(version.encode(), digest_size=8).hexdigest()
+        self._expiry = expiry_seconds
+
+
+    def get(self, doc_id: int) -> tuple[int, int | None]:
+        state: dict = self._redis.hgetall(self._key(doc_id)) # type: ignore[assignment]
+        total = state.get("total")
+        return int(state.get("uploaded", 0)), int(total) if total is not None else None
+
+
+    def is_complete(self, doc_id: int) -> bool:
+        uploaded, total = self.get(doc_id)
+        return total is not None and uploaded >= total
+
+
+    def mark_uploaded(self, uploaded: dict[int, int]):
+        pipe = self._redis.pipeline()
+        for doc_id, count in uploaded.items():
+            pipe.hset(self._key(doc_id), "uploaded", count)
+            pipe.expire(self._key(doc_id), self._expiry)
+        pipe.execute()
+
+
+    def mark_total(self, doc_id: int, total: int):
+        pipe = self._redis.pipeline()
+        pipe.hset(self._key(doc_id), "total", total)
+        pipe.expire(self._key(doc_id), self._expiry)
+        pipe.execute()
+
+
+    def clear(self, doc_ids: list[int]):
+        if doc_ids:
+            self._redis.delete(*(self._key(doc_id) for doc_id in doc_ids))
+
+
+    def _key(self, doc_id: int) -> str:
+        return f"ingest:{self._version}:{doc_id}"
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+import threading
+from typing import Any
+
+
+class LRUCache:
+    def __init__(self, max_items: int | None = None, max_bytes: int | None = None):
+        self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._items: OrderedDict[Hashable, Any] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+
+    def get_many(self, keys: Sequence[Hashable]) -> list[Any | None]:
+        values = []
+        with self._lock:
+            for key in keys:
+                value = self._items.get(key)
+                if value is None:
+                    self._misses += 1
+                else:
+                    self._items.move_to_end(key)
+                    self._hits += 1
+                values.append(value)
+        return values
+
+
+    def put_many(self, keys: Sequence[Hashable], values: Sequence[Any]):
+        if (self._max_items is not None and self._max_items <= 0) or (self._max_bytes is not None and self._max_bytes <= 0):
+            return
+        with self._lock:
+            for key, value in zip(keys, values):
+                previous = self._items.get(key)
+                if previous is not None:
+                    self._bytes -= _size(previous)
+                self._items[key] = value
+                self._items.move_to_end(key)
+                self._bytes += _size(value)
+            while self._items and self._over_limit():
+                self._bytes -= _size(self._items.popitem(last=False)[1])
+
+
+    def _over_limit(self) -> bool:
+        return ((self._max_items is not None and len(self._items) > self._max_items) or
+                (self._max_bytes is not None and self._bytes > self._max_bytes))
+
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._items), "bytes": self._bytes, "hits": self._hits, "misses": self._misses}
+
+
+def _size(value: Any) -> int:
+    # only array values are counted, so a byte bound only makes sense for caches of numpy arrays
+    return getattr(value, "nbytes", 0)
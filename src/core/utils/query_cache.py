@@ -0,0 +1,99 @@
+from hashlib import blake2b
+import threading
+import time
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.utils.embedding_cache import from_arrays, pack_arrays, to_arrays, unpack_arrays
+from src.core.utils.lru_cache import LRUCache
+
+
+_COMPUTE_FIELD = b"compute_seconds"
+
+
+class QueryEmbeddingCache:
+    def __init__(self, redis: Redis | None, version: str, max_items: int, expiry_seconds: int):
+        self._redis = redis
+        self._version = version
+        self._local = LRUCache(max_items)
+        self._expiry_seconds = expiry_seconds
+        self._lock = threading.Lock()
+        self._counts = {"local_hits": 0, "redis_hits": 0, "misses": 0, "redis_errors": 0}
+        self._hit_seconds = 0.0
+        self._saved_seconds = 0.0
+
+
+    async def get(self, query: str) -> dict[str, Any] | None:
+        start = time.perf_counter()
+        key = self._key(query)
+
+        entry = self._local.get_many([key])[0]
+        if entry is not None:
+            embeddings, compute_seconds = entry
+            self._record("local_hits", time.perf_counter() - start, compute_seconds)
+            return embeddings
+
+        if self._redis is not None:
+            try:
+                fields = await self._redis.hgetall(key) # type: ignore[misc]
+            except RedisError:
+                fields = None
+                self._record("redis_errors")
+            if fields:
+                compute_seconds = float(fields.pop(_COMPUTE_FIELD, 0.0))
+                embeddings = {name.decode(): from_arrays(unpack_arrays(data)) for name, data in fields.items()}
+                self._local.put_many([key], [(embeddings, compute_seconds)])
+                self._record("redis_hits", time.perf_counter() - start, compute_seconds)
+                return embeddings
+
+        self._record("misses")
+        return None
+
+
+    async def put(self, query: str, embeddings: dict[str, Any], compute_seconds: float):
+        key = self._key(query)
+        self._local.put_many([key], [(embeddings, compute_seconds)])
+
+        if self._redis is None:
+            return
+        fields: dict[str, bytes | float] = {name: pack_arrays(to_arrays(embedding)) for name, embedding in embeddings.items()}
+        fields[_COMPUTE_FIELD.decode()] = compute_seconds
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, mapping=fields) # type: ignore[arg-type]
+                pipe.expire(key, self._expiry_seconds)
+                await pipe.execute()
+        except RedisError:
+            self._record("redis_errors")
+
+
+    def metrics(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            hit_seconds, saved_seconds = self._hit_seconds, self._saved_seconds
+
+        hits = counts["local_hits"] + counts["redis_hits"]
+        lookups = hits + counts["misses"]
+        return {
+            **counts,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "avg_hit_ms": hit_seconds * 1000 / hits if hits else 0.0,
+            "saved_ms": saved_seconds * 1000,
+            "local_items": self._local.stats()["items"],
+        }
+
+
+    def _record(self, count: str, lookup_seconds: float = 0.0, compute_seconds: float = 0.0):
+        with self._lock:
+            self._counts[count] += 1
+            self._hit_seconds += lookup_seconds
+            # a hit saves the time its entry took to compute, less the lookup itself
+            self._saved_seconds += max(compute_seconds - lookup_seconds, 0.0)
+
+
+    def _key(self, query: str) -> str:
+        # the configured models are uncased, so case and spacing variants share one entry
+        normalized = " ".join(query.casefold().split())
+        return f"qemb:{blake2b(f'{self._version}:{normalized}'.encode(), digest_size=16).hexdigest()}"
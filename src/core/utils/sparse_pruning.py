@@ -0,0 +1,18 @@
+import numpy as np
+from fastembed import SparseEmbedding
+
+
+def prune_sparse(embedding: SparseEmbedding, top_k: int | None, min_weight: float = 0.0) -> SparseEmbedding:
+    if top_k is None and min_weight <= 0:
+        return embedding
+
+    indices, values = embedding.indices, embedding.values
+    if min_weight > 0:
+        keep = values >= min_weight
+        indices, values = indices[keep], values[keep]
+    if top_k is not None and len(values) > top_k:
+        # argpartition scrambles the order, sorting the positions keeps the indices ascending
+        top = np.sort(np.argpartition(-values, top_k - 1)[:top_k])
+        indices, values = indices[top], values[top]
+
+    return SparseEmbedding(indices=indices, values=values)
@@ -0,0 +1,97 @@
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from itertools import islice
+import re
+
+from tokenizers import Tokenizer
+
+
+_WHITESPACE = re.compile(r"\s")
+_BATCH_CHARS = 256 * 1024
+
+
+class TokenChunker:
+    def __init__(self, tokenizer: Tokenizer, max_tokens: int, overlap_tokens: int,
+                 separators: tuple[str, ...] = ("\n\n", "\n", ". ", " ")):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("Chunk overlap has to be smaller than chunk size")
+
+        self._tokenizer = Tokenizer.from_str(tokenizer.to_str())
+        self._tokenizer.no_truncation()
+        self._tokenizer.no_padding()
+        self._max_tokens = max_tokens
+        self._overlap = overlap_tokens
+        self._separators = separators
+
+
+    def split_text(self, text: str) -> list[str]:
+        # short inputs encode much faster than one long string, and tokens seldom span a line break
+        return list(self._split(text.splitlines(keepends=True)))
+
+
+    def split_stream(self, pages: Iterable[str]) -> Iterator[str]:
+        return self._split(page + "\n" for page in pages)
+
+
+    def _split(self, pages: Iterable[str]) -> Iterator[str]:
+        text = ""
+        starts: list[int] = []
+        first = 0
+
+        for batch in self._batches(pages):
+            # one encode_batch call per batch of pages; every cut below is a token offset, so nothing is re-tokenized
+            for page, encoding in zip(batch, self._tokenizer.encode_batch(batch, add_special_tokens=False)):
+                base = len(text)
+                text += page
+                starts.extend(base + start for start, _ in encoding.offsets)
+
+            while len(starts) - first > self._max_tokens:
+                chunk, first = self._cut(text, starts, first)
+                if chunk:
+                    yield chunk
+
+            if first:
+                offset = starts[first]
+                text = text[offset:]
+                starts = [start - offset for start in islice(starts, first, None)]
+                first = 0
+
+        chunk = text[starts[first]:].strip() if first < len(starts) else ""
+        if chunk:
+            yield chunk
+
+
+    def _batches(self, pages: Iterable[str]) -> Iterator[list[str]]:
+        batch: list[str] = []
+        size = 0
+        for page in pages:
+            batch.append(page)
+            size += len(page)
+            if size >= _BATCH_CHARS:
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+
+
+    def _cut(self, text: str, starts: list[int], first: int) -> tuple[str, int]:
+        end = first + self._max_tokens
+        # prefer the coarsest separator that still fills at least half the budget, like the recursive splitter
+        low, high = starts[first + self._max_tokens // 2], starts[end]
+        for separator in self._separators:
+            position = text.rfind(separator, max(low - len(separator), 0), high)
+            if position != -1:
+                end = bisect_left(starts, position + len(separator), first + 1, end)
+                break
+
+        chunk = text[starts[first]:starts[end]].strip()
+        return chunk, self._overlap_start(text, starts, first, end)
+
+
+    def _overlap_start(self, text: str, starts: list[int], first: int, end: int) -> int:
+        start = max(end - self._overlap, first + 1)
+        if start == end or _WHITESPACE.match(text, starts[start] - 1):
+            return start
+        # don't open the next chunk mid-word, unless the text has no word breaks to move to (CJK, long unbroken runs)
+        gap = _WHITESPACE.search(text, starts[start], starts[end])
+        return bisect_left(starts, gap.end(), start, end) if gap else start
@@ -0,0 +1,25 @@
+import numpy as np
+from numpy import ndarray
+
+
+def pool_tokens(vectors: ndarray, pool_factor: int, iterations: int = 10) -> ndarray:
+    if pool_factor <= 1 or len(vectors) <= 1:
+        return vectors
+
+    clusters = -(-len(vectors) // pool_factor)
+    centroids = vectors[np.linspace(0, len(vectors) - 1, clusters).round().astype(int)]
+    counts = np.ones(clusters, dtype=np.int64)
+
+    for _ in range(iterations):
+        assignment = (vectors @ centroids.T).argmax(axis=1)
+        counts = np.bincount(assignment, minlength=clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        sums[counts == 0] = centroids[counts == 0]
+
+        pooled = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+        if np.allclose(pooled, centroids):
+            break
+        centroids = pooled
+
+    return centroids[counts > 0].astype(vectors.dtype)
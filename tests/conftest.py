@@ -0,0 +1,15 @@
+import os
+
+
+for name, value in {
+    "VECTOR_DB_URL": ":memory:",
+    "VECTOR_COLLECTION_NAME": "test_documents",
+    "STORAGE_PATH": "/tmp/vshare-test-storage",
+    "DEFAULT_PICTURE_PATH": "default.png",
+    "DB_URL": "sqlite://",
+    "REDIS_URL": "redis://localhost",
+    "APP_ENV": "DEV",
+    "DOMAIN": "localhost",
+    "JWT_SECRET": "test",
+}.items():
+    os.environ.setdefault(name, value)
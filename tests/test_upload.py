@@ -0,0 +1,176 @@
+from datetime import datetime
+from hashlib import blake2b
+from uuid import uuid4
+
+from fastembed import SparseEmbedding
+from qdrant_client import QdrantClient, models
+from qdrant_client.http.exceptions import UnexpectedResponse
+from tokenizers import Tokenizer, models as tokenizer_models, pre_tokenizers
+import httpx
+import numpy as np
+import pytest
+
+from src.api.documents.schemas import DocumentAdd
+from src.api.vectors.service import VectorService
+from src.core.config.vector import VectorConfig
+from src.core.inference.pipeline import IngestPipeline
+from src.core.utils.file_manager import FileManager
+from src.core.utils.ingest_checkpoint import IngestCheckpoint
+from src.core.utils.text_chunker import TokenChunker
+
+
+DENSE_SIZE = 32
+MULTI_SIZE = 16
+
+
+def _vector(text: str, *shape: int) -> np.ndarray:
+    seed = int.from_bytes(blake2b(text.encode(), digest_size=4).digest(), "little")
+    vector = np.random.default_rng(seed).standard_normal(shape).astype(np.float32)
+    return vector / np.linalg.norm(vector, axis=-1, keepdims=True)
+
+
+class DenseModel:
+    def embed(self, texts, **kwargs):
+        return (_vector(text, DENSE_SIZE) for text in texts)
+
+
+class SparseModel:
+    def embed(self, texts, **kwargs):
+        for text in texts:
+            indices = np.unique([int(blake2b(word.encode(), digest_size=2).hexdigest(), 16) for word in text.split()])
+            yield SparseEmbedding(values=np.ones(len(indices), dtype=np.float32), indices=indices.astype(np.int32))
+
+
+class MultiModel:
+    def embed(self, texts, **kwargs):
+        return (_vector(text, max(1, min(8, len(text.split()))), MULTI_SIZE) for text in texts)
+
+
+class MemoryRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict[str, str]] = {}
+
+
+    def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self.hashes.get(key, {}))
+
+
+    def hset(self, key: str, field: str, value):
+        self.hashes.setdefault(key, {})[field] = str(value)
+
+
+    def expire(self, key: str, seconds: int):
+        pass
+
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self.hashes.pop(key, None)
+
+
+    def pipeline(self) -> "MemoryRedis":
+        return self
+
+
+    def execute(self):
+        pass
+
+
+class FlakyClient(QdrantClient):
+    def __init__(self, failures: int):
+        super().__init__(":memory:")
+        self.failures = failures
+        self.upserts = 0
+
+
+    def upsert(self, *args, **kwargs):
+        self.upserts += 1
+        if self.failures:
+            self.failures -= 1
+            raise UnexpectedResponse(503, "Service Unavailable", b"", httpx.Headers())
+        return super().upsert(*args, **kwargs)
+
+
+def _create_collection(client: QdrantClient):
+    client.create_collection(
+        collection_name=VectorConfig.VECTOR_COLLECTION_NAME,
+        vectors_config={
+            "dense": models.VectorParams(size=DENSE_SIZE, distance=models.Distance.COSINE),
+            "multi": models.VectorParams(size=MULTI_SIZE, distance=models.Distance.COSINE,
+                                         multivector_config=models.MultiVectorConfig(
+                                             comparator=models.MultiVectorComparator.MAX_SIM)),
+        },
+        sparse_vectors_config={"sparse": models.SparseVectorParams()},
+    )
+
+
+def _documents(count: int, pages: int) -> list[tuple[list[str], DocumentAdd]]:
+    documents = []
+    for doc_id in range(count):
+        metadata = DocumentAdd(id=doc_id, group_uid=uuid4(), user_uid=uuid4(), created_at=datetime.now(),
+                               title=f"document-{doc_id}.txt", category_id=1)
+        text = [" ".join(f"word{doc_id}_{page}_{i}" for i in range(120)) for page in range(pages)]
+        documents.append((text, metadata))
+    return documents
+
+
+def _chunker() -> TokenChunker:
+    tokenizer = Tokenizer(tokenizer_models.WordLevel({"[UNK]": 0}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    return TokenChunker(tokenizer, max_tokens=32, overlap_tokens=4)
+
+
+def _ingest(client: QdrantClient, checkpoint: IngestCheckpoint, upload_workers: int):
+    _create_collection(client)
+    service = VectorService(DenseModel(), SparseModel(), MultiModel(), client, # type: ignore[arg-type]
+                            chunker=_chunker(), checkpoint=checkpoint)
+    pipeline = IngestPipeline(FileManager(), service, None, page_queue_size=4, queue_size=2,
+                              upload_batch_size=8, upload_workers=upload_workers)
+
+    points = service.generate_points(iter(_documents(count=3, pages=4)))
+    batches = iter(lambda: [point for _, point in zip(range(8), points)], [])
+    pipeline.upload(batches)
+    return service
+
+
+@pytest.fixture(autouse=True)
+def _fast_retries(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(VectorConfig, "UPLOAD_RETRY_BACKOFF_SECONDS", 0.0)
+    monkeypatch.setattr(VectorConfig, "INGEST_TWO_PHASE", False)
+
+
+@pytest.mark.parametrize("upload_workers", [1, 3])
+def test_upload_stores_every_point_and_marks_checkpoints(upload_workers: int):
+    client = FlakyClient(failures=0)
+    checkpoint = IngestCheckpoint(MemoryRedis(), "test", expiry_seconds=60) # type: ignore[arg-type]
+
+    service = _ingest(client, checkpoint, upload_workers)
+
+    titles, counts = service.report()
+    assert titles == [f"document-{doc_id}.txt" for doc_id in range(3)]
+    assert all(count > 0 for count in counts)
+    assert client.count(VectorConfig.VECTOR_COLLECTION_NAME, exact=True).count == sum(counts)
+    for doc_id, count in enumerate(counts):
+        assert checkpoint.get(doc_id) == (count, count)
+        assert checkpoint.is_complete(doc_id)
+
+
+def test_upload_retries_transient_errors():
+    client = FlakyClient(failures=VectorConfig.UPLOAD_MAX_RETRIES)
+    checkpoint = IngestCheckpoint(MemoryRedis(), "test", expiry_seconds=60) # type: ignore[arg-type]
+
+    service = _ingest(client, checkpoint, upload_workers=2)
+
+    _, counts = service.report()
+    assert client.count(VectorConfig.VECTOR_COLLECTION_NAME, exact=True).count == sum(counts)
+    assert client.upserts == -(-sum(counts) // 8) + VectorConfig.UPLOAD_MAX_RETRIES
+    assert all(checkpoint.is_complete(doc_id) for doc_id in range(len(counts)))
+
+
+def test_upload_gives_up_after_max_retries():
+    client = FlakyClient(failures=VectorConfig.UPLOAD_MAX_RETRIES + 1)
+    checkpoint = IngestCheckpoint(MemoryRedis(), "test", expiry_seconds=60) # type: ignore[arg-type]
+
+    with pytest.raises(UnexpectedResponse):
+        _ingest(client, checkpoint, upload_workers=1)
+    assert not any(checkpoint.get(doc_id)[0] for doc_id in range(3))